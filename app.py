@@ -1,6 +1,13 @@
+import time
+
 import streamlit as st
-from text.main import render_intent_classification_page, render_ten_classification_page, \
-    render_text_to_option
+from text.main import init_state, render_dataset_sidebar
+from text.pages import PAGES, import_timings, load_page
+from text.session import render_memory_sidebar
+from text.timing import end_trace, record_rerun, render_latency_sidebar, render_trace_sidebar, span, start_trace
+
+_rerun_started = time.perf_counter()
+start_trace(st.session_state.get("debug_spans", False))
 
 st.set_page_config(
     page_title="Turing | Amazon Benchmarks",
@@ -30,27 +37,22 @@ if st.sidebar.button("Reset State", use_container_width=True):
     st.session_state.clear()
     st.rerun()
 
-# Navigation
-page = st.sidebar.selectbox(
-    "Choose a page:",
-    ["Intent Classification", "TEN Classification", "Text2Options", "BFCL"]
-)
-
-if page == "Intent Classification":
-    st.markdown('<h1 class="main-header">Intent Classification</h1>', unsafe_allow_html=True)
-    render_intent_classification_page()
-
-elif page == "TEN Classification":
-    st.markdown('<h1 class="main-header">TEN Classification</h1>', unsafe_allow_html=True)
-    render_ten_classification_page()
+init_state()
 
-elif page == "Text2Options":
-    st.markdown('<h1 class="main-header">Text2Options</h1>', unsafe_allow_html=True)
-    render_text_to_option()
-
-elif page == "BFCL":
-    st.markdown('<h1 class="main-header">BFCL</h1>', unsafe_allow_html=True)
-    st.write("This is the BFCL page")
+# Navigation
+page = st.sidebar.selectbox("Choose a page:", list(PAGES))
+
+st.markdown(f'<h1 class="main-header">{page}</h1>', unsafe_allow_html=True)
+with span(f"page: {page}"):
+    load_page(page)()
+
+# Rendered after the page so the counts include a record saved on this rerun.
+render_dataset_sidebar()
+record_rerun("full page", (time.perf_counter() - _rerun_started) * 1000)
+render_latency_sidebar(import_timings())
+render_memory_sidebar()
+render_trace_sidebar()
+end_trace()
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,217 @@
+"""Reproducible benchmarks for data loading, example sampling, prompt/record building and page reruns.
+
+Usage::
+
+    python -m benchmarks.bench                                  # 1K, 10K and 100K rows
+    python -m benchmarks.bench --rows 1000 1000000 10000000 -o results.json
+    python -m benchmarks.bench --skip-apptest                   # library timings only
+
+Synthetic corpora are written once per size (seeded, so reruns produce identical files) to
+``benchmarks/.corpora``, by resampling and perturbing the rows of ``data/intentData_100.jsonl``
+and ``data/Text2Options_100.jsonl``. Every measurement reports min/median/p95/mean in
+milliseconds; the results file also records the git commit, Python and platform, so runs from
+different changes can be diffed directly.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parent.parent
+CORPUS_DIR = Path(__file__).resolve().parent / ".corpora"
+DEFAULT_ROWS = (1_000, 10_000, 100_000)
+# (template file, title key, history key, label keys, assistant name)
+SCHEMAS = {
+    "intent": ("intentData_100.jsonl", "ProductAttributes", "ChatHistory", ("Intent", "Ambiguity"), "Assistant"),
+    "text2options": ("Text2Options_100.jsonl", "ProductType", "ConversationHistory", ("OutputClass",), "COMPASS"),
+}
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "min_ms": ordered[0],
+        "median_ms": statistics.median(ordered),
+        "p95_ms": ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))],
+        "mean_ms": statistics.fmean(ordered),
+    }
+
+
+def measure(func: Callable[[], Any], repeat: int, setup: Callable[[], Any] | None = None) -> dict[str, float]:
+    """Time *repeat* calls of *func* (running *setup* untimed before each one)."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+def make_corpus(task: str, rows: int, seed: int = 0) -> Path:
+    """Write (or reuse) a *rows*-line corpus with *task*'s schema; titles get shuffled words and a serial."""
+    template_file, title_key, _, _, _ = SCHEMAS[task]
+    target = CORPUS_DIR / f"{task}_{rows}.jsonl"
+    if target.exists():
+        return target
+
+    with (ROOT / "data" / template_file).open(encoding="utf-8") as fp:
+        templates = [json.loads(line) for line in fp if line.strip()]
+    vocabulary = sorted({word for row in templates for word in str(row.get(title_key) or "").split()})
+    rng = random.Random(seed)
+    CORPUS_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as out:
+        for i in range(rows):
+            row = dict(rng.choice(templates))
+            row[title_key] = " ".join(rng.sample(vocabulary, min(12, len(vocabulary)))) + f" model {i}"
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+    tmp.replace(target)
+    return target
+
+
+def _drop_sidecars(path: Path) -> None:
+    for sidecar in path.parent.glob(path.name + ".*"):
+        if sidecar.name.endswith(".idx") or ".tok-" in sidecar.name:
+            sidecar.unlink()
+
+
+def bench_library(task: str, path: Path, repeat: int) -> dict[str, Any]:
+    """Time the data/prompt/record hot paths of *task* against the corpus at *path*."""
+    import text.main as app
+    from text.corpus import _cached_corpus
+    from text.jsonl_index import _cached_reader
+    from text.prompting import build_synthetic_prompt
+    from text.records import build_intent_record, build_text2options_record
+    from text.retrieval import get_index
+
+    _, title_key, history_key, label_keys, assistant_name = SCHEMAS[task]
+    name = path.name
+
+    def reset() -> None:
+        _cached_reader.cache_clear()
+        _cached_corpus.cache_clear()
+        get_index.cache_clear()
+
+    def cold_reset() -> None:
+        reset()
+        _drop_sidecars(path)
+
+    def examples(**kwargs: Any) -> Callable[[], str]:
+        return lambda: app._auto_examples(name, history_key, 5, title_key, label_keys=label_keys, **kwargs)
+
+    results: dict[str, Any] = {}
+    # Point the app at the synthetic corpus for this run only; the AppTest pass needs the real data/.
+    with patch.object(app, "DATA_DIR", path.parent):
+        results["load_jsonl.cold"] = measure(lambda: len(app.load_jsonl(name, history_key)), min(repeat, 3),
+                                             cold_reset)
+        results["load_jsonl.warm"] = measure(lambda: len(app.load_jsonl(name, history_key)), repeat, reset)
+        field = app.load_jsonl(name, history_key)
+        rng = random.Random(1)
+        results["load_jsonl.random_access_x100"] = measure(
+            lambda: [field[rng.randrange(len(field))] for _ in range(100)], repeat)
+
+        similar = examples(strategy="Similar", query="wireless speaker bluetooth")
+        results["auto_examples.cold"] = measure(examples(), min(repeat, 3), cold_reset)
+        results["auto_examples.random"] = measure(examples(), repeat)
+        results["auto_examples.stratified"] = measure(examples(stratify=label_keys[0]), repeat)
+        results["auto_examples.similar.cold"] = measure(similar, min(repeat, 3), reset)
+        results["auto_examples.similar"] = measure(similar, repeat)
+        results["auto_examples.token_budget"] = measure(examples(token_budget=1500), repeat)
+        shots = examples()()
+
+    titles = iter(range(10 ** 9))
+    results["prompt.miss"] = measure(lambda: build_synthetic_prompt(3, assistant_name, f"title {next(titles)}", shots),
+                                     repeat)
+    results["prompt.hit"] = measure(lambda: build_synthetic_prompt(3, assistant_name, "title", shots), repeat)
+
+    if task == "intent":
+        build = lambda: build_intent_record("product", shots, "utterance", "PRODUCT_USAGE_QA", "LOW")
+    else:
+        build = lambda: build_text2options_record("product", shots, "question", "a\nb\nc", "b", "related", 2)
+    results["record.build_and_dumps"] = measure(lambda: json.dumps(build(), indent=2, ensure_ascii=False), repeat)
+    return results
+
+
+def bench_apptest(repeat: int, timeout: float) -> dict[str, Any]:
+    """End-to-end rerun latency of every registered page through Streamlit's ``AppTest``."""
+    from streamlit.testing.v1 import AppTest
+
+    from text.pages import PAGES
+
+    results: dict[str, Any] = {}
+    for title in PAGES:
+        at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=timeout)
+        started = time.perf_counter()
+        at.run()
+        first = (time.perf_counter() - started) * 1000
+        selector = next(box for box in at.sidebar.selectbox if box.label == "Choose a page:")
+        started = time.perf_counter()
+        selector.set_value(title).run()
+        switch = (time.perf_counter() - started) * 1000
+        # A page that renders ``st.error`` (e.g. "File not found") is broken even though it did not raise.
+        if errors := [str(exc.message) for exc in at.exception] + [str(error.value) for error in at.error]:
+            results[title] = {"error": errors}
+            continue
+        results[title] = {"first_run_ms": first, "switch_ms": switch, "rerun": measure(at.run, repeat)}
+    return results
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=list(DEFAULT_ROWS))
+    parser.add_argument("--tasks", nargs="+", choices=sorted(SCHEMAS), default=sorted(SCHEMAS))
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--skip-apptest", action="store_true")
+    parser.add_argument("--apptest-timeout", type=float, default=120.0)
+    parser.add_argument("-o", "--output", type=Path, default=Path("bench_results.json"))
+    args = parser.parse_args(argv)
+
+    report: dict[str, Any] = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "library": {},
+    }
+    for task in args.tasks:
+        for rows in args.rows:
+            started = time.perf_counter()
+            path = make_corpus(task, rows)
+            print(f"{task} {rows:,} rows: corpus ready in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+            report["library"][f"{task}/{rows}"] = bench_library(task, path, args.repeat)
+    failed = []
+    if not args.skip_apptest:
+        report["apptest"] = bench_apptest(args.repeat, args.apptest_timeout)
+        failed = [title for title, result in report["apptest"].items() if "error" in result]
+
+    args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Results written to {args.output}", file=sys.stderr)
+    for title in failed:
+        print(f"{title}: " + "; ".join(report["apptest"][title]["error"]), file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
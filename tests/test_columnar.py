@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from text.columnar import CATEGORICAL_VOCABULARIES, MISSING, ColumnarReader, ColumnarWriter, export_jsonl
+from text.records import INTENT_TASK
+
+RECORDS = [
+    {"ChatHistory": "Customer: Hi \n Assistant: Hello! \n", "Intent": "OPEN_DOMAIN_DIALOG", "Ambiguity": "LOW"},
+    {"ChatHistory": "Customer: Où est ma commande ? ✨", "Intent": "<Intent>BRAND_NEW_LABEL</Intent>",
+     "Ambiguity": ""},
+    {"ChatHistory": None, "Intent": "OPEN_DOMAIN_DIALOG", "Ambiguity": ["not", "a", "label"]},
+]
+
+
+def test_round_trip(tmp_path: Path) -> None:
+    path = tmp_path / "intent.tcol"
+    with ColumnarWriter(path, INTENT_TASK) as writer:
+        writer.write_many(RECORDS)
+    reader = ColumnarReader(path)
+
+    assert len(reader) == 3
+    assert list(reader.iter_rows()) == [
+        {"ChatHistory": RECORDS[0]["ChatHistory"], "Intent": "OPEN_DOMAIN_DIALOG", "Ambiguity": "LOW"},
+        {"ChatHistory": RECORDS[1]["ChatHistory"], "Intent": "BRAND_NEW_LABEL", "Ambiguity": ""},
+        {"ChatHistory": "", "Intent": "OPEN_DOMAIN_DIALOG", "Ambiguity": '["not", "a", "label"]'},
+    ]
+
+    intent = reader["Intent"]
+    vocabulary = CATEGORICAL_VOCABULARIES[INTENT_TASK]["Intent"]
+    assert intent.vocabulary == vocabulary + ["BRAND_NEW_LABEL"]
+    assert intent.numpy().tolist() == [vocabulary.index("OPEN_DOMAIN_DIALOG"), len(vocabulary),
+                                       vocabulary.index("OPEN_DOMAIN_DIALOG")]
+    assert reader["Ambiguity"].numpy()[1] == MISSING
+
+    offsets, blob = reader["ChatHistory"].numpy()
+    encoded = RECORDS[0]["ChatHistory"].encode() + RECORDS[1]["ChatHistory"].encode()
+    assert offsets.tolist() == [0, len(RECORDS[0]["ChatHistory"].encode()), len(encoded), len(encoded)]
+    assert blob.tobytes() == encoded
+
+
+def test_failed_export_keeps_the_previous_file(tmp_path: Path) -> None:
+    source = tmp_path / "intent.jsonl"
+    source.write_text(json.dumps(RECORDS[0]) + "\n{not json\n", encoding="utf-8")
+    target = tmp_path / "intent.tcol"
+    target.write_bytes(b"previous export")
+
+    with pytest.raises(json.JSONDecodeError):
+        export_jsonl(source, target, INTENT_TASK)
+    assert target.read_bytes() == b"previous export"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["intent.jsonl", "intent.tcol"]
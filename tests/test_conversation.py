@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from text.conversation import ASSISTANT_NAMES, CUSTOMER, Conversation, Turn
+from text.records import format_conversation
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def _histories() -> list[str]:
+    histories = []
+    for name, key in (("intentData_100.jsonl", "ChatHistory"), ("Text2Options_100.jsonl", "ConversationHistory")):
+        with (DATA_DIR / name).open(encoding="utf-8") as fp:
+            histories += [row[key] for row in map(json.loads, fp) if row.get(key)]
+    return histories
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "Customer: Hi \n Assistant: Hello! \n",
+    "Customer: Hi\nAssistant: Hello!\nCustomer: Bye",
+    "Customer: Hi \n COMPASS: Which model? \n Customer: The blue one",
+    "Hello there\nCustomer: hi\nAssistant: yo",
+    " Customer: hi\n Assistant: yo",
+    "Customer:hi \n Assistant:\tyo",
+    "Customer:  two spaces\nAssistant:",
+    "Customer: one\n\n Assistant: two \r\n Customer: three   ",
+    "no labels at all",
+])
+def test_parse_format_round_trip(text: str) -> None:
+    assert Conversation.parse(text).format() == text
+
+
+def test_round_trip_of_shipped_histories() -> None:
+    histories = _histories()
+    assert histories
+    for text in histories:
+        assert Conversation.parse(text).format() == text
+
+
+def test_parse_turns() -> None:
+    conversation = Conversation.parse("Intro\nCustomer:hi \n COMPASS: Which model? \n Customer: The blue one\n")
+    assert list(conversation) == [Turn(CUSTOMER, "hi"), Turn("COMPASS", "Which model?"),
+                                  Turn(CUSTOMER, "The blue one")]
+    assert conversation.preamble == "Intro\n"
+    assert conversation.exchanges == 2
+    assert conversation.is_alternating()
+
+
+def test_format_normalises_separators_only() -> None:
+    conversation = Conversation.parse("Customer: a\nAssistant: b\n\nCustomer: c")
+    assert conversation.format(separator="\n") == "Customer: a\nAssistant: b\nCustomer: c"
+
+
+def test_from_pairs_matches_format_conversation() -> None:
+    pairs = [("Hi", "Hello!"), ("Does it float?", "It does.")]
+    text = format_conversation(pairs, ASSISTANT_NAMES[0])
+    assert text == "Customer: Hi\nAssistant: Hello!\nCustomer: Does it float?\nAssistant: It does."
+    assert Conversation.parse(text) == Conversation.from_pairs(pairs, ASSISTANT_NAMES[0])
+
+
+def test_not_alternating() -> None:
+    assert not Conversation.parse("Assistant: Hello\nCustomer: hi").is_alternating()
+    assert not Conversation.parse("Customer: a\nCustomer: b").is_alternating()
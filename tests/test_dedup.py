@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from text.dedup import NearDuplicateIndex
+
+TEXT = "Customer: My speaker will not pair with my phone over bluetooth \n Assistant: Let us reset the pairing list"
+
+
+def test_finds_near_duplicates_across_signature_growth() -> None:
+    index = NearDuplicateIndex()
+    for n in range(1500):
+        index.add(f"filler:{n}", f"Customer: question number {n} about order {n * 7} \n Assistant: answer {n}")
+    index.add("first", TEXT)
+    index.add("second", TEXT)
+    assert len(index) == 1502
+    assert sorted(key for key, _ in index.query(TEXT + " please")) == ["first", "second"]
+    assert index.query("Customer: where is the invoice for my refrigerator delivery") == []
+
+
+def test_check_and_add_skips_duplicates_unless_allowed() -> None:
+    index = NearDuplicateIndex()
+    assert index.check_and_add("a", TEXT) == []
+    assert [key for key, _ in index.check_and_add("b", TEXT)] == ["a"]
+    assert len(index) == 1
+    index.check_and_add("b", TEXT, add_duplicates=True)
+    assert sorted(key for key, _ in index.check_and_add("c", TEXT, add_duplicates=True)) == ["a", "b"]
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from text.jsonl_index import JsonlField, JsonlReader
+
+
+def test_field_view_indexes_and_slices(tmp_path: Path) -> None:
+    path = tmp_path / "rows.jsonl"
+    path.write_text('{"text": "a"}\n\n{"other": 1}\n{"text": "c"}\nnot json\n', encoding="utf-8")
+    field = JsonlField(JsonlReader(path), "text")
+
+    assert len(field) == 4
+    assert field[0] == "a" and field[-2] == "c"
+    assert field[1] == field[3] == ""
+    assert field[:2] == ["a", ""]
+    assert field[::-2] == ["", ""]
+    assert field[1:10] == ["", "c", ""]
+    assert list(field) == ["a", "", "c", ""]
+    assert "c" in field
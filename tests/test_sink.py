@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from text.sink import DatasetSink
+
+
+def test_failed_flush_leaves_no_partial_batch(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "intent.jsonl"
+    sink = DatasetSink(path, "intent", batch_size=1000, flush_interval=3600)
+    sink.append({"Intent": "OPEN_DOMAIN_DIALOG", "n": 0})
+    sink.flush()
+
+    def failing_fsync(fd: int) -> None:
+        raise OSError("disk full")
+
+    for n in (1, 2):
+        sink.append({"Intent": "OPEN_DOMAIN_DIALOG", "n": n})
+    with monkeypatch.context() as patched:
+        patched.setattr(os, "fsync", failing_fsync)
+        with pytest.raises(OSError):
+            sink.flush()
+    assert sink.pending == 2
+    assert len(path.read_bytes().splitlines()) == 1
+
+    sink.close()
+    assert [json.loads(line)["n"] for line in path.read_bytes().splitlines()] == [0, 1, 2]
+    assert DatasetSink(path, "intent", flush_interval=3600).stats.rows == 3
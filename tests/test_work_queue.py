@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from text.work_queue import DONE, LEASED, OPEN, SKIPPED, WorkQueue
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+VALID = {"ProductAttributes": "Bluetooth speaker", "ChatHistory": "Customer: Hi \n Assistant: Hello! \n",
+         "CustomerUtterance": "Okay.", "Intent": "OPEN_DOMAIN_DIALOG", "Ambiguity": "LOW", "Labelled?": None}
+
+
+def _write_rows(path: Path, rows: list[dict]) -> Path:
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def source(tmp_path: Path) -> Path:
+    return _write_rows(tmp_path / "rows.jsonl", [VALID] * 3 + [{**VALID, "Labelled?": "yes"}])
+
+
+@pytest.fixture
+def queue(tmp_path: Path) -> WorkQueue:
+    return WorkQueue(tmp_path / "queue.sqlite3")
+
+
+def test_ingest_queues_unlabelled_rows_once(queue: WorkQueue, source: Path) -> None:
+    assert queue.ingest(source) == 3
+    assert queue.ingest(source) == 0
+    assert queue.stats() == {OPEN: 3, LEASED: 0, DONE: 0, SKIPPED: 0}
+
+
+def test_ingest_flags_or_skips_rows_that_cannot_validate(queue: WorkQueue, tmp_path: Path) -> None:
+    rows = _write_rows(tmp_path / "flagged.jsonl", [VALID, {**VALID, "ChatHistory": ""}])
+    assert queue.ingest(rows, skip_flagged=True) == 1
+    assert queue.ingest(rows) == 1
+    notes = [queue.claim(owner).notes for owner in ("a", "b")]
+    assert notes[0] == ""
+    assert notes[1]
+
+
+def test_ingest_skips_rows_of_other_tasks_and_without_a_label_column(queue: WorkQueue, tmp_path: Path) -> None:
+    unlabelled = {key: value for key, value in VALID.items() if key != "Labelled?"}
+    rows = _write_rows(tmp_path / "mixed.jsonl", [VALID, unlabelled, {"Labelled?": None}])
+    assert queue.ingest(rows) == 1
+    assert queue.ingest(DATA_DIR / "Text2Options_100.jsonl") == 0
+    assert queue.stats()[OPEN] == 1
+
+
+def test_claim_returns_the_held_item_until_completed(queue: WorkQueue, source: Path) -> None:
+    queue.ingest(source)
+    item = queue.claim("alice")
+    assert item.record["ChatHistory"] == VALID["ChatHistory"]
+    assert queue.claim("alice").id == item.id
+    assert queue.claim("bob").id != item.id
+    assert queue.renew(item.id, "alice")
+    assert not queue.complete(item.id, "bob")
+    assert queue.complete(item.id, "alice")
+    assert queue.claim("alice").id not in (item.id, None)
+    assert queue.stats()[DONE] == 1
+
+
+def test_skip_and_release(queue: WorkQueue, source: Path) -> None:
+    queue.ingest(source)
+    skipped = queue.claim("alice")
+    assert queue.complete(skipped.id, "alice", SKIPPED)
+    released = queue.claim("alice")
+    assert queue.release(released.id, "alice")
+    assert queue.claim("bob").id == released.id
+    assert queue.stats() == {OPEN: 1, LEASED: 1, DONE: 0, SKIPPED: 1}
+    with pytest.raises(ValueError):
+        queue.complete(released.id, "bob", OPEN)
+
+
+def test_expired_lease_is_reclaimed(queue: WorkQueue, source: Path) -> None:
+    queue.ingest(source)
+    stale = queue.claim("alice", lease_seconds=-1)
+    assert queue.stats()[OPEN] == 3
+    assert queue.claim("bob").id == stale.id
+    assert not queue.renew(stale.id, "alice")
+    assert not queue.complete(stale.id, "alice")
+    assert queue.complete(stale.id, "bob")
+
+
+def _claim_all(path: Path, owner: str) -> list[int]:
+    queue = WorkQueue(path)
+    claimed = []
+    while (item := queue.claim(owner)) is not None:
+        claimed.append(item.id)
+        assert queue.complete(item.id, owner)
+    return claimed
+
+
+def test_claims_are_disjoint_across_processes(queue: WorkQueue, tmp_path: Path) -> None:
+    queue.ingest(_write_rows(tmp_path / "many.jsonl", [VALID] * 200))
+    with ProcessPoolExecutor(max_workers=6) as pool:
+        claims = list(pool.map(_claim_all, [queue.path] * 6, [f"worker-{n}" for n in range(6)]))
+    ids = [item_id for claimed in claims for item_id in claimed]
+    assert len(ids) == len(set(ids)) == 200
+    assert queue.stats()[DONE] == 200
+
+
+def test_counts_table_tracks_every_transition_and_is_seeded_for_old_queues(queue: WorkQueue, source: Path) -> None:
+    queue.ingest(source)
+    queue.claim("alice", lease_seconds=-1)
+    queue.claim("bob")
+    done = queue.claim("carol")
+    queue.complete(done.id, "carol")
+    stats = queue.stats()
+    scanned = dict(queue._db.execute("SELECT status, COUNT(*) FROM items GROUP BY status").fetchall())
+    assert stats == {status: scanned.get(status, 0) for status in stats}
+    queue._db.execute("DROP TABLE counts")
+    assert WorkQueue(queue.path).stats() == stats
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+import time
+
+import streamlit as st
+
+from ..function_catalog import FUNCTION_CATALOG, get_catalog
+from ..main import DATA_DIR, emit_record
+from ..prompts import BFCL_INSTRUCTIONS
+from ..records import BFCL_TASK, build_bfcl_record
+from ..session import forget_derived, recall_derived, remember_derived
+from ..timing import span, timed, traced
+
+_MATCHES = 25
+
+
+@traced()
+def render_bfcl_page() -> None:
+    st.subheader("Fixed Instructions")
+    with st.expander("Task Instructions"):
+        st.markdown(BFCL_INSTRUCTIONS)
+
+    catalog = get_catalog(DATA_DIR / FUNCTION_CATALOG)
+    if catalog is None:
+        st.error(f"File not found: {DATA_DIR / FUNCTION_CATALOG}")
+        return
+
+    st.subheader("Per-Sample Section")
+    st.session_state.setdefault("bfcl_functions", [])
+    function_picker_fragment()
+    st.text_area("User Question", key="bfcl_question", placeholder="What the user asks the model…")
+    bfcl_output_fragment()
+
+
+def _add_function(name: str) -> None:
+    if name and name not in st.session_state.bfcl_functions:
+        st.session_state.bfcl_functions = [*st.session_state.bfcl_functions, name]
+
+
+@st.fragment
+@timed("bfcl functions")
+def function_picker_fragment() -> None:
+    """Search the catalog (prefix matches first, then description matches) and pick the offered functions."""
+    catalog = get_catalog(DATA_DIR / FUNCTION_CATALOG)
+    query = st.text_input("Search functions", key="bfcl_query", placeholder="Name prefix or keywords…")
+    started = time.perf_counter()
+    matches = list(dict.fromkeys(catalog.complete(query, _MATCHES) + catalog.search(query, _MATCHES)))[:_MATCHES] \
+        if query.strip() else []
+    st.caption(f"{len(matches)} of {len(catalog):,} functions in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    if matches:
+        name = st.selectbox("Function", matches, key="bfcl_match")
+        definition = catalog.get(name) or {}
+        st.caption(definition.get("description", ""))
+        st.button("➕ Add function", on_click=_add_function, args=(name,), use_container_width=True)
+
+    st.multiselect("Offered functions", sorted(set(st.session_state.bfcl_functions)), key="bfcl_functions")
+    for name in st.session_state.bfcl_functions:
+        with st.expander(name):
+            st.json(catalog.get(name) or {}, expanded=True)
+
+
+@st.fragment
+@timed("bfcl output")
+def bfcl_output_fragment() -> None:
+    """Ground-truth calls, validated line by line against the offered functions' schemas as they are typed."""
+    catalog = get_catalog(DATA_DIR / FUNCTION_CATALOG)
+    offered = set(st.session_state.bfcl_functions)
+    text = st.text_area("Ground-Truth Calls (one per line)", key="bfcl_calls",
+                        placeholder='get_weather(city="Seattle", unit="celsius")')
+
+    started = time.perf_counter()
+    calls, errors = [], []
+    for number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        name, arguments, problems = catalog.validate_call(line)
+        if name is not None and not problems and name not in offered:
+            problems = [f"{name} is not one of the offered functions"]
+        errors += [f"Line {number}: {problem}" for problem in problems]
+        calls.append((name, arguments))
+    if calls:
+        st.caption(f"Checked {len(calls)} calls in {(time.perf_counter() - started) * 1000:.1f} ms")
+    for error in errors:
+        st.error(error, icon="❌")
+
+    if st.button("Generate BFCL JSON", use_container_width=True, disabled=bool(errors) or not calls):
+        forget_derived("bfcl_json")
+        question = st.session_state.get("bfcl_question", "").strip()
+        if not question:
+            st.error("The user question is empty", icon="❌")
+            return
+        functions = [catalog.get(name) for name in st.session_state.bfcl_functions]
+        with span("bfcl JSON"):
+            record = build_bfcl_record(question, functions, calls)
+            pretty_json = json.dumps(record, indent=2, ensure_ascii=False)
+        emit_record(BFCL_TASK, record)
+        remember_derived("bfcl_json", pretty_json)
+
+    if pretty_json := recall_derived("bfcl_json"):
+        with st.expander("JSON Output"):
+            st.code(pretty_json, language="json", wrap_lines=True)
+        st.download_button("📥 Download JSON", data=pretty_json, file_name="bfcl_sample.json",
+                           mime="application/json", use_container_width=True)
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import json
+from uuid import uuid4
+
+import streamlit as st
+
+from ..main import ExampleSource, add_auto_turn_fragment, add_manual_turn_fragment, emit_record, passes_validation
+from ..prompts import (INTENT_AMBIGUITY_LEVEL_DEFINITION, INTENT_AMBIGUITY_LEVELS, INTENT_DEFINITION,
+                       INTENT_GENERAL_INSTRUCTIONS, INTENT_INSTRUCTIONS_REMINDER, INTENT_K_SHOT_EXAMPLES,
+                       INTENT_OPTIONS)
+from ..records import INTENT_TASK, build_intent_record, format_conversation
+from ..session import forget_derived, recall_derived, remember_derived
+from ..timing import span, timed, traced
+from ..work_queue import DONE, SKIPPED, get_work_queue
+
+INTENT_EXAMPLES = ExampleSource("intentData_100.jsonl", "ChatHistory", "ProductAttributes", ("Intent", "Ambiguity"))
+
+
+@traced()
+def render_intent_classification_page() -> None:
+    st.subheader("Fixed Instructions")
+    with st.expander("General Instructions"):
+        st.markdown(INTENT_GENERAL_INSTRUCTIONS)
+    with st.expander("Intent Definitions"):
+        st.code(INTENT_DEFINITION, language="xml")
+    with st.expander("Ambiguity Level Definitions"):
+        st.code(INTENT_AMBIGUITY_LEVEL_DEFINITION, language="xml")
+    with st.expander("K-Shot Examples"):
+        st.code(INTENT_K_SHOT_EXAMPLES, language="xml")
+    with st.expander("Instruction Reminder"):
+        st.markdown(INTENT_INSTRUCTIONS_REMINDER)
+
+    st.subheader("Per-Sample Section")
+    render_intent_classification_form()
+
+
+def _annotator() -> str:
+    """Lease owner for this browser session."""
+    return st.session_state.setdefault("_annotator_id", uuid4().hex)
+
+
+def _claim_item() -> None:
+    """Lease the next unlabelled row and prefill the form with it."""
+    item = get_work_queue().claim(_annotator())
+    if item is None:
+        st.session_state.pop("_work_item", None)
+        return
+    st.session_state._work_item = item
+    record = item.record
+    st.session_state.intent_product_attributes = record.get("ProductAttributes") or ""
+    st.session_state.assistant_synthetic_conversation = record.get("ChatHistory") or ""
+    st.session_state.intent_customer_utterance = record.get("CustomerUtterance") or ""
+    if record.get("Intent") in INTENT_OPTIONS:
+        st.session_state.intent_options = record["Intent"]
+    if record.get("Ambiguity") in INTENT_AMBIGUITY_LEVELS:
+        st.session_state.intent_ambiguity_level = record["Ambiguity"]
+
+
+def _release_item() -> None:
+    if (item := st.session_state.pop("_work_item", None)) is not None:
+        get_work_queue().release(item.id, _annotator())
+
+
+def _finish_item(status: str) -> None:
+    """Close the claimed item without saving a record: labelled elsewhere (``DONE``) or unusable (``SKIPPED``)."""
+    if (item := st.session_state.pop("_work_item", None)) is not None:
+        get_work_queue().complete(item.id, _annotator(), status)
+
+
+def render_work_queue() -> None:
+    """Claim unlabelled rows from the shared queue; the lease is renewed on every rerun while the item is open."""
+    queue = get_work_queue()
+    with st.expander("Work queue"):
+        item = st.session_state.get("_work_item")
+        if item is not None and not queue.renew(item.id, _annotator()):
+            st.warning("The lease on this item expired and it went back to the queue", icon="⚠️")
+            st.session_state.pop("_work_item")
+            item = None
+
+        stats = queue.stats()
+        st.caption(" · ".join(f"{count:,} {status}" for status, count in stats.items()))
+        if not any(stats.values()):
+            st.caption("The queue is empty; fill it with `python -m text.work_queue ingest data/intentData_100.jsonl`")
+        left, right = st.columns(2)
+        left.button("📥 Claim next item", on_click=_claim_item, disabled=item is not None or not stats["open"],
+                    use_container_width=True)
+        right.button("↩️ Release item", on_click=_release_item, disabled=item is None, use_container_width=True)
+        if item is None:
+            return
+        st.caption(f"Labelling item #{item.id} (`{item.source}:{item.line + 1}`); saving its JSON marks it done")
+        if item.notes:
+            st.warning(f"Flagged at ingest: {item.notes}", icon="⚠️")
+        if not st.session_state.get("save_to_dataset", True):
+            st.info("Saving is off, so generating the JSON will not close this item; mark it done once labelled",
+                    icon="ℹ️")
+        left, right = st.columns(2)
+        left.button("✅ Mark done without saving", on_click=_finish_item, args=(DONE,), use_container_width=True)
+        right.button("⏭️ Skip item", on_click=_finish_item, args=(SKIPPED,), use_container_width=True,
+                     help="Close the item as unusable, e.g. a row that cannot pass validation")
+
+
+@traced()
+def render_intent_classification_form() -> None:
+    render_work_queue()
+    st.text_input("Product Attributes", key="intent_product_attributes")
+
+    generation_mode = st.radio(
+        "Conversation history generation approach",
+        ("Automatic", "Manual"),
+        horizontal=True,
+    )
+
+    if generation_mode == "Automatic":
+        add_auto_turn_fragment(INTENT_EXAMPLES, st.session_state.intent_product_attributes, "Assistant")
+    else:
+        add_manual_turn_fragment()
+
+    intent_output_fragment()
+
+
+@st.fragment
+@timed("intent output")
+def intent_output_fragment() -> None:
+    """Label inputs and JSON output for the intent form; edits here rerun only this fragment."""
+    st.text_input("Customer Utterance", key="intent_customer_utterance")
+    st.selectbox("Intent Option", INTENT_OPTIONS, key="intent_options")
+    st.selectbox("Ambiguity Level", INTENT_AMBIGUITY_LEVELS, key="intent_ambiguity_level")
+
+    if st.button("Generate Intent Classification JSON", use_container_width=True):
+        conversation_history = (
+                st.session_state.get("assistant_synthetic_conversation")
+                or format_conversation(st.session_state.chat_history.pairs(), "Assistant")
+        )
+        with span("intent JSON"):
+            benchmark = build_intent_record(
+                st.session_state.intent_product_attributes,
+                conversation_history,
+                st.session_state.intent_customer_utterance,
+                st.session_state.intent_options,
+                st.session_state.intent_ambiguity_level,
+            )
+
+        forget_derived("intent_json")
+        if not passes_validation(benchmark, INTENT_TASK):
+            return
+        item = st.session_state.get("_work_item")
+        # A claimed row's own conversation is being labelled, not generated, so it skips the duplicate check.
+        claimed = item is not None and conversation_history == item.record.get("ChatHistory")
+        saved = emit_record(INTENT_TASK, benchmark, None if claimed else conversation_history)
+        with span("intent JSON"):
+            remember_derived("intent_json", json.dumps(benchmark, indent=2, ensure_ascii=False))
+        if saved and item is not None:
+            st.session_state.pop("_work_item")
+            if get_work_queue().complete(item.id, _annotator()):
+                st.rerun()  # redraw the work queue controls, which live outside this fragment
+            st.warning(f"Item #{item.id} was reassigned after its lease expired; the record was still saved",
+                       icon="⚠️")
+
+    # The rendered JSON is kept across reruns as a derived value, so the session budget may evict it.
+    if pretty_json := recall_derived("intent_json"):
+        with st.expander("JSON Output"):
+            st.code(pretty_json, language="json", wrap_lines=True)
+        st.download_button("📥 Download JSON", data=pretty_json, file_name="intent_classification.json",
+                           mime="application/json", use_container_width=True)
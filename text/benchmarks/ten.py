@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+
+import streamlit as st
+
+from ..main import emit_record
+from ..prompts import TEN_DETAILED_INSTRUCTIONS, TEN_ESCI_CATEGORIES, TEN_GENERAL_INSTRUCTIONS
+from ..records import TEN_TASK
+from ..timing import traced
+
+
+@traced()
+def render_ten_classification_page() -> None:
+    st.subheader("Fixed Instructions")
+    with st.expander("General Instructions"):
+        st.markdown(TEN_GENERAL_INSTRUCTIONS)
+    with st.expander("Detailed Instructions"):
+        st.markdown(TEN_DETAILED_INSTRUCTIONS)
+
+    st.subheader("Per-Sample Section")
+    render_ten_classification_form()
+
+
+@dataclass
+class ProductDetailInput:
+    """Container for product detail fields."""
+
+    keywords: str = ""
+    title: list[str] = None
+    bullet_points: list[str] = None
+    product_type: list[str] = None
+    gl_product_type: list[str] = None
+    brand: list[str] = None
+    color: list[str] = None
+    size: list[str] = None
+    ground_truth: str = ""
+
+    @traced("ten JSON")
+    def to_json(self) -> str:
+        return json.dumps(self.__dict__, indent=2, ensure_ascii=False)
+
+
+@traced()
+def render_ten_classification_form() -> None:
+    with st.form("ten_form"):
+        data = ProductDetailInput(
+            keywords=st.text_input("Search Query"),
+            title=st.text_area("Product Title").strip().splitlines(),
+            brand=st.text_area("Product Brand").strip().splitlines(),
+            bullet_points=st.text_area("Product Bullet Points").strip().splitlines(),
+            product_type=st.text_area("Product Type").strip().splitlines(),
+            gl_product_type=st.text_area("General Ledger Category").strip().splitlines(),
+            color=st.text_area("Product Color").strip().splitlines(),
+            size=st.text_area("Product Size").strip().splitlines(),
+            ground_truth=st.selectbox("ESCI Categories", TEN_ESCI_CATEGORIES),
+        )
+
+        if st.form_submit_button("Generate Product JSON", use_container_width=True):
+            emit_record(TEN_TASK, data.__dict__)
+            with st.expander("JSON Output"):
+                st.code(data.to_json(), language="json", wrap_lines=True)
+    st.download_button(
+        "📥 Download JSON",
+        data=data.to_json(),
+        file_name="product_details.json",
+        mime="application/json",
+        use_container_width=True
+    )
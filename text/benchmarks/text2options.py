@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+
+import streamlit as st
+
+from ..main import ExampleSource, add_auto_turn_fragment, add_manual_turn_fragment, emit_record, passes_validation
+from ..prompts import TEXT_TO_OPTION_K_SHOT_EXAMPLES, TEXT_TO_OPTION_OUTPUT_CLASS, TEXT_TO_OPTION_TASK_INSTRUCTIONS
+from ..records import TEXT2OPTIONS_TASK, build_text2options_record, format_conversation
+from ..session import forget_derived, recall_derived, remember_derived
+from ..timing import span, timed, traced
+
+TEXT2OPTIONS_EXAMPLES = ExampleSource("Text2Options_100.jsonl", "ConversationHistory", "ProductType", ("OutputClass",))
+
+
+@traced()
+def render_text_to_option() -> None:
+    st.subheader("Fixed Instructions")
+    with st.expander("Task Instructions"):
+        st.markdown(TEXT_TO_OPTION_TASK_INSTRUCTIONS)
+    with st.expander("K-Shot Examples"):
+        st.code(TEXT_TO_OPTION_K_SHOT_EXAMPLES, language="xml")
+    st.subheader("Per-Sample Section")
+    render_text_to_option_form()
+
+
+@traced()
+def render_text_to_option_form() -> None:
+    st.text_input("Product Type", key="txt2_product_type")
+
+    generation_mode = st.radio("Conversation history generation approach", ("Automatic", "Manual"), horizontal=True)
+
+    if generation_mode == "Automatic":
+        add_auto_turn_fragment(TEXT2OPTIONS_EXAMPLES, st.session_state.txt2_product_type, "COMPASS")
+    else:
+        add_manual_turn_fragment()
+
+    text_to_option_output_fragment()
+
+
+@st.fragment
+@timed("text2options output")
+def text_to_option_output_fragment() -> None:
+    """Label inputs and JSON output for the Text2Options form; edits here rerun only this fragment."""
+    st.text_input("Question", key="txt2_question")
+    st.text_area("Options", key="txt2_options")
+    st.text_input("Input", key="txt2_input")
+    st.selectbox("Output Class", TEXT_TO_OPTION_OUTPUT_CLASS, key="txt2_output_class")
+    st.number_input("Output Class Index", value=0, key="txt2_output_class_index")
+
+    if st.button("Generate Text2Options JSON", use_container_width=True):
+        conversation_history = (
+                st.session_state.get("compass_synthetic_conversation")
+                or format_conversation(st.session_state.chat_history.pairs(), "COMPASS")
+        )
+        with span("text2options JSON"):
+            product_details = build_text2options_record(
+                st.session_state.get("txt2_product_type", ""),
+                conversation_history,
+                st.session_state.get("txt2_question", ""),
+                st.session_state.get("txt2_options", ""),
+                st.session_state.get("txt2_input", ""),
+                st.session_state.get("txt2_output_class", ""),
+                st.session_state.get("txt2_output_class_index", -1),
+            )
+
+        forget_derived("text2options_json")
+        if not passes_validation(product_details, TEXT2OPTIONS_TASK):
+            return
+        emit_record(TEXT2OPTIONS_TASK, product_details, conversation_history)
+        with span("text2options JSON"):
+            remember_derived("text2options_json", json.dumps(product_details, indent=2, ensure_ascii=False))
+
+    if pretty_json := recall_derived("text2options_json"):
+        with st.expander("JSON Output"):
+            st.code(pretty_json, language="json", wrap_lines=True)
+
+        st.download_button("📥 Download JSON", data=pretty_json, file_name="product_details.json",
+                           mime="application/json", use_container_width=True)
@@ -0,0 +1,281 @@
+"""Columnar binary export of benchmark records for training jobs.
+
+Usage::
+
+    python -m text.columnar output/intent.jsonl -o intent.tcol
+    python -m text.columnar export.jsonl --task ten -o ten.tcol
+
+Layout (all sections 8-byte aligned, little endian)::
+
+    b"TCOL0001" | column sections … | footer (JSON) | footer length (u64) | b"TCOL0001"
+
+Text columns are a ``uint64`` offsets section (rows + 1 entries) followed by a UTF-8 blob;
+categorical columns are one ``uint8`` code per row against the vocabulary stored in the footer,
+which starts with the task's label list from :mod:`text.prompts` so codes are stable across files.
+Which fields are categorical depends on the task: BFCL's ``ground_truth``, for one, is a call list.
+NumPy is only imported by the ``numpy()`` accessors.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Iterable, Iterator, Mapping
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO
+
+from .prompts import INTENT_AMBIGUITY_LEVELS, INTENT_OPTIONS, TEN_ESCI_CATEGORIES, TEXT_TO_OPTION_OUTPUT_CLASS
+from .records import INTENT_TASK, TEN_TASK, TEXT2OPTIONS_TASK
+from .validation import untag
+
+if TYPE_CHECKING:
+    import numpy as np
+
+MAGIC = b"TCOL0001"
+_U64 = struct.Struct("<Q")
+MISSING = 255
+
+# Label fields of each task; other tasks (and other fields) are stored as text.
+CATEGORICAL_VOCABULARIES: dict[str, dict[str, list[str]]] = {
+    INTENT_TASK: {"Intent": INTENT_OPTIONS, "Ambiguity": INTENT_AMBIGUITY_LEVELS},
+    TEXT2OPTIONS_TASK: {"OutputClass": TEXT_TO_OPTION_OUTPUT_CLASS},
+    TEN_TASK: {"ground_truth": TEN_ESCI_CATEGORIES},
+}
+
+
+def _as_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+class _TextSpool:
+    def __init__(self) -> None:
+        self.blob = tempfile.TemporaryFile()
+        self.offsets = tempfile.TemporaryFile()
+        self.size = 0
+        self.offsets.write(_U64.pack(0))
+
+    def append(self, value: str) -> None:
+        encoded = value.encode()
+        self.blob.write(encoded)
+        self.size += len(encoded)
+        self.offsets.write(_U64.pack(self.size))
+
+    def close(self) -> None:
+        self.blob.close()
+        self.offsets.close()
+
+
+class ColumnarWriter:
+    """Stream records into a columnar file; only the categorical codes are kept in memory (1 byte/row).
+
+    Columns are fixed by the first record. The *task*'s categorical fields (see
+    :data:`CATEGORICAL_VOCABULARIES`) are untagged and encoded; values outside the vocabulary
+    extend it, up to 255 labels, and values that are not strings are encoded as their JSON text.
+    """
+
+    def __init__(self, path: Path, task: str) -> None:
+        self.path = path
+        self.task = task
+        self.rows = 0
+        self._columns: list[str] | None = None
+        self._text: dict[str, _TextSpool] = {}
+        self._codes: dict[str, array] = {}
+        self._vocab: dict[str, dict[str, int]] = {}
+
+    def __enter__(self) -> ColumnarWriter:
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, *exc: object) -> None:
+        # A failed export must not leave a valid-looking file with only the rows written so far.
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def _init_columns(self, record: Mapping[str, Any]) -> None:
+        self._columns = list(record)
+        vocabularies = CATEGORICAL_VOCABULARIES.get(self.task, {})
+        for name in self._columns:
+            if name in vocabularies:
+                self._codes[name] = array("B")
+                self._vocab[name] = {label: code for code, label in enumerate(vocabularies[name])}
+            else:
+                self._text[name] = _TextSpool()
+
+    def _encode(self, name: str, value: Any) -> int:
+        value = untag(value)
+        if value is None or value == "":
+            return MISSING
+        value = _as_text(value)
+        vocab = self._vocab[name]
+        code = vocab.get(value)
+        if code is None:
+            if len(vocab) >= MISSING:
+                raise ValueError(f"Column {name!r} has more than {MISSING} distinct labels")
+            code = vocab[value] = len(vocab)
+        return code
+
+    def write(self, record: Mapping[str, Any]) -> None:
+        if self._columns is None:
+            self._init_columns(record)
+        for name, spool in self._text.items():
+            spool.append(_as_text(record.get(name)))
+        for name, codes in self._codes.items():
+            codes.append(self._encode(name, record.get(name)))
+        self.rows += 1
+
+    def write_many(self, records: Iterable[Mapping[str, Any]]) -> None:
+        for record in records:
+            self.write(record)
+
+    @staticmethod
+    def _pad(out: BinaryIO) -> None:
+        out.write(b"\0" * (-out.tell() % 8))
+
+    def discard(self) -> None:
+        """Drop the spooled columns without writing :attr:`path`."""
+        for spool in self._text.values():
+            spool.close()
+
+    def close(self) -> None:
+        """Write the file next to :attr:`path` and move it into place once complete."""
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self._write_file(tmp)
+            os.replace(tmp, self.path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        finally:
+            self.discard()
+
+    def _write_file(self, path: Path) -> None:
+        columns = []
+        with path.open("wb") as out:
+            out.write(MAGIC)
+            for name in self._columns or []:
+                if name in self._codes:
+                    start = out.tell()
+                    self._codes[name].tofile(out)
+                    columns.append({"name": name, "kind": "category", "offset": start, "length": self.rows,
+                                    "vocabulary": list(self._vocab[name])})
+                else:
+                    spool = self._text[name]
+                    offsets_start = out.tell()
+                    spool.offsets.seek(0)
+                    shutil.copyfileobj(spool.offsets, out)
+                    blob_start = out.tell()
+                    spool.blob.seek(0)
+                    shutil.copyfileobj(spool.blob, out)
+                    columns.append({"name": name, "kind": "text", "offset": offsets_start, "length": self.rows,
+                                    "blob_offset": blob_start, "blob_length": spool.size})
+                self._pad(out)
+            footer = json.dumps({"rows": self.rows, "columns": columns}).encode()
+            out.write(footer)
+            out.write(_U64.pack(len(footer)))
+            out.write(MAGIC)
+
+
+class TextColumn:
+    """Zero-copy view of a text column; items decode on access."""
+
+    def __init__(self, buffer: memoryview, meta: dict[str, Any]) -> None:
+        self.offsets = buffer[meta["offset"]:meta["offset"] + 8 * (meta["length"] + 1)].cast("Q")
+        self.blob = buffer[meta["blob_offset"]:meta["blob_offset"] + meta["blob_length"]]
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx: int) -> str:
+        return str(self.blob[self.offsets[idx]:self.offsets[idx + 1]], "utf-8")
+
+    def numpy(self) -> tuple[np.ndarray, np.ndarray]:
+        """``(offsets, blob)`` as NumPy arrays sharing the mapped memory."""
+        import numpy as np
+
+        return np.frombuffer(self.offsets, dtype=np.uint64), np.frombuffer(self.blob, dtype=np.uint8)
+
+
+class CategoryColumn:
+    """Zero-copy view of a ``uint8`` label column (:data:`MISSING` marks an empty value)."""
+
+    def __init__(self, buffer: memoryview, meta: dict[str, Any]) -> None:
+        self.codes = buffer[meta["offset"]:meta["offset"] + meta["length"]]
+        self.vocabulary: list[str] = meta["vocabulary"]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, idx: int) -> str:
+        code = self.codes[idx]
+        return "" if code == MISSING else self.vocabulary[code]
+
+    def numpy(self) -> np.ndarray:
+        """Codes as a NumPy ``uint8`` array sharing the mapped memory."""
+        import numpy as np
+
+        return np.frombuffer(self.codes, dtype=np.uint8)
+
+
+class ColumnarReader:
+    """Memory-mapped reader; column views never copy, rows are materialised only when iterated."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as fp:
+            self._mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mm)
+        if bytes(buffer[:8]) != MAGIC or bytes(buffer[-8:]) != MAGIC:
+            raise ValueError(f"{path} is not a columnar export")
+        (footer_length,) = _U64.unpack(buffer[-16:-8])
+        footer = json.loads(bytes(buffer[-16 - footer_length:-16]))
+        self.rows: int = footer["rows"]
+        self.columns: dict[str, TextColumn | CategoryColumn] = {
+            meta["name"]: (TextColumn if meta["kind"] == "text" else CategoryColumn)(buffer, meta)
+            for meta in footer["columns"]
+        }
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, name: str) -> TextColumn | CategoryColumn:
+        return self.columns[name]
+
+    def iter_rows(self, columns: Iterable[str] | None = None) -> Iterator[dict[str, str]]:
+        """Stream rows as dicts (optionally only *columns*)."""
+        selected = [(name, self.columns[name]) for name in (columns or self.columns)]
+        for idx in range(self.rows):
+            yield {name: column[idx] for name, column in selected}
+
+
+def export_jsonl(source: Path, target: Path, task: str) -> int:
+    """Convert a JSONL dataset of *task* records to the columnar format; returns the row count."""
+    with source.open("rb") as fp, ColumnarWriter(target, task) as writer:
+        writer.write_many(json.loads(line) for line in fp if line.strip())
+        return writer.rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", type=Path, help="JSONL dataset")
+    parser.add_argument("-o", "--output", type=Path, required=True)
+    parser.add_argument("--task", help="task whose label fields are encoded (default: the source file's stem)")
+    args = parser.parse_args(argv)
+
+    rows = export_jsonl(args.source, args.output, args.task or args.source.stem)
+    print(f"{rows} rows -> {args.output} ({args.output.stat().st_size / 1e6:.1f} MB)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import re
+from array import array
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+
+CUSTOMER = "Customer"
+ASSISTANT_NAMES = ("Assistant", "COMPASS")
+
+
+class Turn:
+    """One utterance: who said it and what was said."""
+
+    __slots__ = ("speaker", "text")
+
+    def __init__(self, speaker: str, text: str) -> None:
+        self.speaker = speaker
+        self.text = text
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Turn) and (self.speaker, self.text) == (other.speaker, other.text)
+
+    def __repr__(self) -> str:
+        return f"Turn({self.speaker!r}, {self.text!r})"
+
+
+@lru_cache(maxsize=None)
+def _label_pattern(speakers: tuple[str, ...]) -> re.Pattern[str]:
+    names = "|".join(re.escape(name) for name in sorted(speakers, key=len, reverse=True))
+    return re.compile(rf"(?:^|(?<=\n))[ \t]*({names}):[ \t]?")
+
+
+class Conversation:
+    """Flat ``"Customer: … \\n Assistant: …"`` history held as speaker codes plus a text list.
+
+    Speakers are stored as ``uint8`` indices into :attr:`speakers`, so a turn costs one byte plus its
+    text. :meth:`parse` records the separator and trailing whitespace it saw, any text before the
+    first label (:attr:`preamble`) and every irregular separator or label spacing (``Customer:hi``),
+    which lets :meth:`format` reproduce the input exactly.
+    """
+
+    __slots__ = ("speakers", "_codes", "_texts", "_gaps", "_colons", "separator", "trailing", "preamble")
+
+    def __init__(self, speakers: Iterable[str] = (CUSTOMER, *ASSISTANT_NAMES), *, separator: str = "\n",
+                 trailing: str = "", preamble: str = "") -> None:
+        self.speakers: tuple[str, ...] = tuple(speakers)
+        self._codes = array("B")
+        self._texts: list[str] = []
+        # Separators that differ from ``separator``, keyed by the index of the turn they precede.
+        self._gaps: dict[int, str] = {}
+        # Spacing after a label's colon when it is not the usual single space, keyed by turn index.
+        self._colons: dict[int, str] = {}
+        self.separator = separator
+        self.trailing = trailing
+        self.preamble = preamble
+
+    @classmethod
+    def parse(cls, text: str, speakers: Iterable[str] = (CUSTOMER, *ASSISTANT_NAMES)) -> Conversation:
+        """Tokenise *text* in a single regex pass.
+
+        Text before the first label is not a turn; it is kept as :attr:`preamble` (all of *text*
+        when there is no label at all).
+        """
+        conversation = cls(speakers)
+        codes = {name: code for code, name in enumerate(conversation.speakers)}
+        matches = list(_label_pattern(conversation.speakers).finditer(text))
+        conversation.preamble = text[:matches[0].start(1)] if matches else text
+        for i, match in enumerate(matches):
+            if (colon := text[match.end(1) + 1:match.end()]) != " ":
+                conversation._colons[i] = colon
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+            body = text[match.end():end]
+            stripped = body.rstrip()
+            if i + 1 < len(matches):
+                gap = body[len(stripped):] + text[matches[i + 1].start():matches[i + 1].start(1)]
+                if i == 0:
+                    conversation.separator = gap
+                elif gap != conversation.separator:
+                    conversation._gaps[i + 1] = gap
+            else:
+                conversation.trailing = body[len(stripped):]
+            conversation._codes.append(codes[match.group(1)])
+            conversation._texts.append(stripped)
+        return conversation
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[tuple[str, str]], assistant_name: str) -> Conversation:
+        """Build from manual ``(user_input, assistant_output)`` pairs."""
+        conversation = cls((CUSTOMER, assistant_name))
+        for user, assistant in pairs:
+            conversation.append(CUSTOMER, user)
+            conversation.append(assistant_name, assistant)
+        return conversation
+
+    def append(self, speaker: str, text: str) -> None:
+        if speaker not in self.speakers:
+            self.speakers += (speaker,)
+        self._codes.append(self.speakers.index(speaker))
+        self._texts.append(text)
+
+    def extend(self, other: Conversation) -> None:
+        """Append every turn of *other* (the manual/automatic merge)."""
+        for turn in other:
+            self.append(turn.speaker, turn.text)
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __getitem__(self, idx: int) -> Turn:
+        return Turn(self.speakers[self._codes[idx]], self._texts[idx])
+
+    def __iter__(self) -> Iterator[Turn]:
+        for code, text in zip(self._codes, self._texts):
+            yield Turn(self.speakers[code], text)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Conversation) and list(self) == list(other)
+
+    def count(self, speaker: str) -> int:
+        return self._codes.count(self.speakers.index(speaker)) if speaker in self.speakers else 0
+
+    @property
+    def exchanges(self) -> int:
+        """Number of customer turns, i.e. customer/assistant exchanges."""
+        return self.count(CUSTOMER)
+
+    def is_alternating(self) -> bool:
+        """True when the customer opens and the customer/assistant roles strictly alternate."""
+        customer = self.speakers.index(CUSTOMER) if CUSTOMER in self.speakers else -1
+        return all((code == customer) == (i % 2 == 0) for i, code in enumerate(self._codes))
+
+    def format(self, separator: str | None = None, trailing: str | None = None) -> str:
+        """Serialise back to the flat string form; passing *separator* normalises every gap to it."""
+        if not self._texts:
+            return self.preamble
+        gaps = self._gaps if separator is None else {}
+        separator = self.separator if separator is None else separator
+        trailing = self.trailing if trailing is None else trailing
+        parts = [self.preamble]
+        for i, (code, text) in enumerate(zip(self._codes, self._texts)):
+            if i:
+                parts.append(gaps.get(i, separator))
+            parts.append(f"{self.speakers[code]}:{self._colons.get(i, ' ')}{text}")
+        parts.append(trailing)
+        return "".join(parts)
+
+
+@lru_cache(maxsize=256)
+def parse_conversation(text: str, assistant_name: str) -> Conversation:
+    """Memoised :meth:`Conversation.parse`, so reruns with unchanged text skip the tokenising pass.
+
+    The returned object is shared; copy it (``extend`` into a new one) before mutating.
+    """
+    return Conversation.parse(text, (CUSTOMER, assistant_name))
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+
+from .sink import DATASET_DIR
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key       BLOB PRIMARY KEY,
+    value     TEXT NOT NULL,
+    size      INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+CREATE TABLE IF NOT EXISTS counters (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO counters VALUES ('hits', 0), ('misses', 0), ('bytes', 0);
+-- Seeded once from the table (for caches created before the counter existed), then kept current on writes.
+INSERT OR IGNORE INTO counters SELECT 'entries', COUNT(*) FROM entries;
+"""
+
+
+class ConversationCache:
+    """Content-addressed SQLite cache of generated conversations.
+
+    Entries are keyed by the SHA-256 of the model name and the fully rendered prompt. Once the
+    stored values exceed *max_bytes*, least recently used entries are evicted. Hit/miss counters
+    are persisted with the cache so they survive restarts.
+    """
+
+    def __init__(self, path: Path, *, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    @staticmethod
+    def key(prompt: str, model: str = "") -> bytes:
+        return hashlib.sha256(f"{model}\0{prompt}".encode()).digest()
+
+    def _bump(self, name: str, delta: int) -> None:
+        self._db.execute("UPDATE counters SET value = value + ? WHERE name = ?", (delta, name))
+
+    def get(self, prompt: str, model: str = "") -> str | None:
+        key = self.key(prompt, model)
+        with self._lock:
+            row = self._db.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            with self._db:
+                if row is None:
+                    self._bump("misses", 1)
+                    return None
+                self._db.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+                self._bump("hits", 1)
+            return row[0]
+
+    def put(self, prompt: str, conversation: str, model: str = "") -> None:
+        key = self.key(prompt, model)
+        size = len(conversation.encode())
+        with self._lock, self._db:
+            previous = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)", (key, conversation, size, time.time()))
+            self._bump("bytes", size - (previous[0] if previous else 0))
+            if previous is None:
+                self._bump("entries", 1)
+            self._evict()
+
+    def _evict(self) -> None:
+        (total,) = self._db.execute("SELECT value FROM counters WHERE name = 'bytes'").fetchone()
+        if total <= self.max_bytes:
+            return
+        victims, freed = [], 0
+        for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            if total - freed <= self.max_bytes:
+                break
+            victims.append((key,))
+            freed += size
+        self._db.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self._bump("bytes", -freed)
+        self._bump("entries", -len(victims))
+
+    def stats(self) -> dict[str, int]:
+        """Return ``hits``, ``misses``, ``bytes`` and ``entries``, read from the counters table only."""
+        with self._lock:
+            return dict(self._db.execute("SELECT name, value FROM counters").fetchall())
+
+
+@lru_cache(maxsize=None)
+def get_conversation_cache() -> ConversationCache:
+    """Process-wide cache stored alongside the generated datasets."""
+    return ConversationCache(DATASET_DIR / "conversation_cache.sqlite3")
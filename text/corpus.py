@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import random
+import zlib
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from itertools import zip_longest
+from pathlib import Path
+
+from .jsonl_index import JsonlReader, get_reader, load_sidecar
+from .prompting import estimate_tokens
+
+
+@dataclass(eq=False)
+class ExampleCorpus:
+    """Example file exposed as (title, history, labels) rows, read lazily through a :class:`JsonlReader`."""
+
+    reader: JsonlReader
+    title_key: str
+    history_key: str
+    label_keys: tuple[str, ...] = ()
+
+    @property
+    def path(self) -> Path:
+        return self.reader.path
+
+    def __len__(self) -> int:
+        return len(self.reader)
+
+    def row(self, idx: int) -> tuple[str, str] | None:
+        """Return ``(title, history)`` for line *idx*, or ``None`` when the line is not a usable example."""
+        obj = self.reader[idx]
+        if not obj:
+            return None
+        history = obj.get(self.history_key)
+        title = (obj.get(self.title_key) or "").strip()
+        if not (title and history):
+            return None
+        return title, history
+
+    def labels(self, idx: int) -> dict[str, str]:
+        obj = self.reader[idx] or {}
+        return {key: str(obj.get(key) or "") for key in self.label_keys}
+
+    def rows(self) -> Iterator[tuple[str, str]]:
+        """Stream every line as ``(title, history)``; unusable lines yield empty strings to keep ids aligned."""
+        for idx in range(len(self)):
+            yield self.row(idx) or ("", "")
+
+    def example(self, idx: int) -> str | None:
+        """Render the *idx*‑th row the way the synthetic prompt expects it."""
+        row = self.row(idx)
+        if row is None:
+            return None
+        title, history = row
+        return f"Product: {title}\n\nConversation:\n {history}"
+
+    @cached_property
+    def token_lengths(self) -> Sequence[int]:
+        """Estimated token count of every rendered example (``0`` for unusable rows), persisted next to the file."""
+        suffix = f".tok-{zlib.crc32(f'{self.title_key}|{self.history_key}'.encode()):08x}"
+
+        def build() -> array:
+            return array("I", (estimate_tokens(self.example(idx) or "") for idx in range(len(self))))
+
+        return load_sidecar(self.path, suffix, "I", build)
+
+    def pack(self, candidates: Iterable[int], budget: int, overhead: int = 0, max_misses: int = 32) -> list[int]:
+        """Greedily keep candidate rows, in order, while their token lengths fit into *budget*.
+
+        *overhead* is charged per kept row (e.g. the divider). Packing stops once *max_misses*
+        candidates in a row did not fit, so only lengths are looked up and no row is parsed.
+        """
+        lengths = self.token_lengths
+        chosen: list[int] = []
+        seen: set[int] = set()
+        used = misses = 0
+        for idx in candidates:
+            if idx in seen:
+                continue
+            seen.add(idx)
+            cost = lengths[idx]
+            if not cost:
+                continue
+            if used + cost + overhead <= budget:
+                chosen.append(idx)
+                used += cost + overhead
+                misses = 0
+            else:
+                misses += 1
+                if misses >= max_misses:
+                    break
+        return chosen
+
+    def random_ids(self, draws: int) -> Iterator[int]:
+        """Yield *draws* random row ids (with repeats and unusable rows; callers filter)."""
+        n = len(self)
+        return (random.randrange(n) for _ in range(draws)) if n else iter(())
+
+    @cached_property
+    def label_buckets(self) -> dict[str, dict[str, array]]:
+        """Ids of the usable rows grouped by value, for every label key; built in one pass on first use."""
+        buckets: dict[str, dict[str, array]] = {key: {} for key in self.label_keys}
+        for idx in range(len(self)):
+            obj = self.reader[idx]
+            if not obj or not (obj.get(self.history_key) and (obj.get(self.title_key) or "").strip()):
+                continue
+            for key, by_value in buckets.items():
+                if value := str(obj.get(key) or ""):
+                    by_value.setdefault(value, array("I")).append(idx)
+        return buckets
+
+    def stratified_sample(self, k: int, key: str, value: str | None = None,
+                          exclude: set[int] = frozenset()) -> list[int]:
+        """Draw up to *k* distinct usable rows by the *key* label from :attr:`label_buckets`, without scanning them.
+
+        With *value* only rows carrying that label are drawn; otherwise *k* is spread evenly over
+        every label (small labels give up their share to the others) and the picks are interleaved.
+        Rows in *exclude* are skipped before a label's share is counted, so they never shrink the sample.
+        """
+        buckets = self.label_buckets[key]
+        if value is not None:
+            return self._draw(buckets.get(value, ()), k, exclude)
+
+        groups = list(buckets.values())
+        random.shuffle(groups)
+        groups.sort(key=len)
+        picks: list[list[int]] = []
+        remaining = k
+        for i, bucket in enumerate(groups):
+            # Labels come smallest first, so whatever one falls short of its share goes to the larger ones.
+            picks.append(self._draw(bucket, -(-remaining // (len(groups) - i)), exclude))
+            remaining -= len(picks[-1])
+        # Exclusions can leave the last labels short; top up from any label that still has rows.
+        for bucket, picked in zip(reversed(groups), reversed(picks)):
+            if remaining <= 0:
+                break
+            picked += (extra := self._draw(bucket, remaining, exclude.union(picked)))
+            remaining -= len(extra)
+        random.shuffle(picks)
+        return [idx for column in zip_longest(*picks) for idx in column if idx is not None]
+
+    @staticmethod
+    def _draw(bucket: Sequence[int], k: int, exclude: set[int]) -> list[int]:
+        """Up to *k* random ids of *bucket* outside *exclude* (``k + len(exclude)`` are drawn, then filtered)."""
+        drawn = random.sample(bucket, min(len(bucket), k + len(exclude)))
+        return [idx for idx in drawn if idx not in exclude][:k]
+
+    def sample(self, k: int, exclude: set[int] = frozenset(), max_draws: int | None = None) -> list[int]:
+        """Draw up to *k* distinct usable row ids, parsing only the rows that are drawn."""
+        n = len(self)
+        max_draws = max_draws if max_draws is not None else 4 * k + 16
+        chosen: list[int] = []
+        seen = set(exclude)
+        for _ in range(max_draws):
+            if len(chosen) >= k or len(seen) >= n:
+                break
+            idx = random.randrange(n)
+            if idx in seen:
+                continue
+            seen.add(idx)
+            if self.row(idx) is not None:
+                chosen.append(idx)
+        return chosen
+
+
+@lru_cache(maxsize=16)
+def _cached_corpus(path: Path, title_key: str, history_key: str, label_keys: tuple[str, ...],
+                   mtime_ns: int, size: int) -> ExampleCorpus:
+    # ``mtime_ns``/``size`` are only part of the cache key so an edited file gets rebuilt.
+    corpus = ExampleCorpus(get_reader(path), title_key, history_key, label_keys)
+    if label_keys:
+        corpus.label_buckets  # Precompute once per load, so stratified draws never scan the file.
+    return corpus
+
+
+def get_corpus(path: Path, title_key: str, history_key: str,
+               label_keys: tuple[str, ...] = ()) -> ExampleCorpus | None:
+    """Return the shared corpus for *path*, rebuilding it only when the file changes on disk."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return _cached_corpus(path, title_key, history_key, label_keys, stat.st_mtime_ns, stat.st_size)
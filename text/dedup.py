@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import re
+import threading
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from .jsonl_index import JsonlReader
+
+_PRIME = np.uint64((1 << 31) - 1)
+_TAG_RE = re.compile(r"</?[a-z_]+>")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text: str, size: int = 3) -> np.ndarray:
+    """Hashed word *size*-grams of *text*, ignoring case, punctuation and wrapper XML tags."""
+    tokens = _TOKEN_RE.findall(_TAG_RE.sub(" ", text.lower()))
+    if len(tokens) < size:
+        tokens = [" ".join(tokens)] if tokens else []
+        size = 1
+    grams = {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+    return np.fromiter((zlib.crc32(gram.encode()) % _PRIME for gram in grams), dtype=np.uint64, count=len(grams))
+
+
+class NearDuplicateIndex:
+    """Incremental MinHash/LSH index over conversation text.
+
+    Each text is reduced to a *num_perm* MinHash signature split into *bands*; texts sharing any
+    band bucket are candidates, confirmed by the signature-estimated Jaccard similarity. Lookups
+    only touch the buckets of the query, so they stay flat as the index grows.
+
+    Signatures live in one growable ``uint32`` matrix. Buckets are keyed by a 64-bit hash of the
+    band and hold a bare id until a second text lands in them, so each stored text costs its
+    signature row plus one small-int dict entry per band.
+    """
+
+    def __init__(self, *, num_perm: int = 128, bands: int = 16, threshold: float = 0.8, seed: int = 1) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)[:, None]
+        self.rows = num_perm // bands
+        # Odd multipliers of a (wrapping) multiply-add hash over each band's values.
+        self._mix = rng.integers(0, np.iinfo(np.uint64).max, size=self.rows, dtype=np.uint64) | np.uint64(1)
+        self.threshold = threshold
+        self._buckets: list[dict[int, int | list[int]]] = [{} for _ in range(bands)]
+        self._signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._keys: list[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def signature(self, text: str) -> np.ndarray | None:
+        hashes = shingles(text)
+        if not hashes.size:
+            return None
+        # Operands stay below 2**31, so ``a * h + b`` fits in uint64 without overflow.
+        return ((self._a * hashes[None, :] + self._b) % _PRIME).min(axis=1).astype(np.uint32)
+
+    def _bands(self, signature: np.ndarray) -> list[int]:
+        """One 64-bit hash per band; a collision only adds a candidate, which the similarity check rejects."""
+        return (signature.reshape(-1, self.rows).astype(np.uint64) * self._mix).sum(axis=1).tolist()
+
+    def _query(self, signature: np.ndarray) -> list[tuple[str, float]]:
+        candidates: set[int] = set()
+        for buckets, band in zip(self._buckets, self._bands(signature)):
+            bucket = buckets.get(band)
+            if isinstance(bucket, int):
+                candidates.add(bucket)
+            elif bucket is not None:
+                candidates.update(bucket)
+        if not candidates:
+            return []
+        ids = np.fromiter(candidates, dtype=np.intp, count=len(candidates))
+        similarities = (self._signatures[ids] == signature).mean(axis=1)
+        matches = [(self._keys[doc_id], float(similarity)) for doc_id, similarity in zip(ids.tolist(), similarities)
+                   if similarity >= self.threshold]
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    def _add(self, key: str, signature: np.ndarray) -> None:
+        doc_id = len(self._keys)
+        if doc_id == len(self._signatures):
+            grown = np.empty((max(2 * doc_id, 1024), signature.size), dtype=np.uint32)
+            grown[:doc_id] = self._signatures
+            self._signatures = grown
+        self._signatures[doc_id] = signature
+        self._keys.append(key)
+        for buckets, band in zip(self._buckets, self._bands(signature)):
+            bucket = buckets.setdefault(band, doc_id)
+            if isinstance(bucket, list):
+                bucket.append(doc_id)
+            elif bucket != doc_id:
+                buckets[band] = [bucket, doc_id]
+
+    def query(self, text: str) -> list[tuple[str, float]]:
+        """Return ``(key, estimated_jaccard)`` for stored texts at or above the threshold, best first."""
+        signature = self.signature(text)
+        if signature is None:
+            return []
+        with self._lock:
+            return self._query(signature)
+
+    def add(self, key: str, text: str) -> None:
+        signature = self.signature(text)
+        if signature is not None:
+            with self._lock:
+                self._add(key, signature)
+
+    def check_and_add(self, key: str, text: str, *, add_duplicates: bool = False) -> list[tuple[str, float]]:
+        """Query and (unless it is a near-duplicate) insert *text* atomically; returns the matches."""
+        signature = self.signature(text)
+        if signature is None:
+            return []
+        with self._lock:
+            matches = self._query(signature)
+            if add_duplicates or not matches:
+                self._add(key, signature)
+            return matches
+
+    def add_jsonl(self, path: Path, text_key: str) -> None:
+        """Index the *text_key* field of every row in *path* (rows are keyed ``<file>:<line>``)."""
+        if not path.exists():
+            return
+        for line_no, record in enumerate(JsonlReader(path), start=1):
+            if record and record.get(text_key):
+                self.add(f"{path.name}:{line_no}", record[text_key])
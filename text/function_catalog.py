@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import ast
+import json
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Callable, Iterator, Mapping
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from .jsonl_index import JsonlReader
+
+Validator = Callable[[Any, str], Iterator[str]]
+
+# Function definitions offered on the BFCL page, in ``data/``; a catalog rather than a record shard.
+FUNCTION_CATALOG = "bfcl_functions.jsonl"
+
+_WORD = re.compile(r"[a-z0-9]+")
+# BFCL schemas use Python-flavoured type names next to the JSON-schema ones.
+_TYPES: dict[str, tuple[type, ...]] = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "float": (int, float),
+    "boolean": (bool,),
+    "array": (list, tuple),
+    "tuple": (list, tuple),
+    "object": (dict,),
+    "dict": (dict,),
+    "any": (object,),
+    "null": (type(None),),
+}
+
+
+def _words(text: str) -> list[str]:
+    """Lower-case word tokens; ``snake_case`` and ``dotted.names`` split into their parts."""
+    return _WORD.findall(text.lower())
+
+
+def compile_schema(schema: Mapping[str, Any]) -> Validator:
+    """Turn a (BFCL / JSON-schema subset) parameter schema into a validator closure.
+
+    Supported: ``type`` (a name or a list of names; unknown names are ignored), ``enum``,
+    ``minimum``/``maximum``, ``items``, ``properties``, ``required`` and
+    ``additionalProperties: false``. The validator yields error messages for a value at the given path.
+    """
+    checks: list[Validator] = []
+
+    declared = schema.get("type")
+    declared = [declared] if isinstance(declared, str) else declared if isinstance(declared, list) else []
+    kinds = [kind for kind in declared if isinstance(kind, str) and kind in _TYPES]
+    if kinds:
+        expected = tuple(t for kind in kinds for t in _TYPES[kind])
+        # ``bool`` is an ``int`` subclass; only accept it where a boolean is asked for.
+        allow_bool = "boolean" in kinds or "any" in kinds
+        described = " or ".join(kinds)
+
+        def check_type(value: Any, path: str) -> Iterator[str]:
+            if not isinstance(value, expected) or (isinstance(value, bool) and not allow_bool):
+                yield f"{path}: expected {described}, got {type(value).__name__}"
+
+        checks.append(check_type)
+
+    if (enum := schema.get("enum")) is not None:
+        allowed = list(enum)
+
+        def check_enum(value: Any, path: str) -> Iterator[str]:
+            if value not in allowed:
+                yield f"{path}: {value!r} is not one of {allowed}"
+
+        checks.append(check_enum)
+
+    low, high = schema.get("minimum"), schema.get("maximum")
+    if low is not None or high is not None:
+        def check_range(value: Any, path: str) -> Iterator[str]:
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                if low is not None and value < low:
+                    yield f"{path}: {value} is below the minimum {low}"
+                if high is not None and value > high:
+                    yield f"{path}: {value} is above the maximum {high}"
+
+        checks.append(check_range)
+
+    if isinstance(items := schema.get("items"), Mapping):
+        item_check = compile_schema(items)
+
+        def check_items(value: Any, path: str) -> Iterator[str]:
+            if isinstance(value, (list, tuple)):
+                for i, item in enumerate(value):
+                    yield from item_check(item, f"{path}[{i}]")
+
+        checks.append(check_items)
+
+    properties = {name: compile_schema(sub) for name, sub in (schema.get("properties") or {}).items()}
+    required = list(schema.get("required") or ())
+    closed = schema.get("additionalProperties") is False
+    if properties or required or closed:
+        def check_properties(value: Any, path: str) -> Iterator[str]:
+            if not isinstance(value, dict):
+                return
+            for name in required:
+                if name not in value:
+                    yield f"{path}.{name}: required argument is missing"
+            for name, item in value.items():
+                if name in properties:
+                    yield from properties[name](item, f"{path}.{name}")
+                elif closed:
+                    yield f"{path}.{name}: unexpected argument"
+
+        checks.append(check_properties)
+
+    def validate(value: Any, path: str) -> Iterator[str]:
+        for check in checks:
+            yield from check(value, path)
+
+    return validate
+
+
+def parse_call(text: str) -> tuple[str, dict[str, Any]]:
+    """Parse an authored call, either BFCL's ``name(arg=value, …)`` or ``{"name": …, "arguments": {…}}``.
+
+    Raises :class:`ValueError` with a readable message when the text is neither.
+    """
+    text = text.strip()
+    if text.startswith("{"):
+        try:
+            call = json.loads(text)
+            if not isinstance(call, dict) or not isinstance(call.get("name"), str):
+                raise ValueError('A JSON call needs a "name" string and an "arguments" object')
+            arguments = call.get("arguments", {})
+            if isinstance(arguments, str):
+                arguments = json.loads(arguments)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Invalid JSON: {exc}") from None
+        except RecursionError:
+            raise ValueError("The call is nested too deeply") from None
+        if not isinstance(arguments, dict):
+            raise ValueError('"arguments" must be an object of argument names to values')
+        return call["name"], arguments
+
+    try:
+        node = ast.parse(text, mode="eval").body
+    except SyntaxError as exc:
+        raise ValueError(f"Invalid call syntax: {exc.msg}") from None
+    except (ValueError, MemoryError, RecursionError):
+        # Older Pythons reject null bytes with ValueError; absurdly nested input exhausts the parser.
+        raise ValueError("Invalid call syntax") from None
+    if not isinstance(node, ast.Call):
+        raise ValueError("Expected a single call such as name(arg=value)")
+    if node.args:
+        raise ValueError("Pass every argument by keyword")
+    if any(kw.arg is None for kw in node.keywords):
+        raise ValueError("Spell out every argument; **kwargs is not supported")
+    try:
+        arguments = {kw.arg: ast.literal_eval(kw.value) for kw in node.keywords}
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        # TypeError: unhashable dict keys or set members, e.g. ``{[1]: 2}``.
+        raise ValueError("Argument values must be literals (strings, numbers, lists, dicts, …)") from None
+    return ast.unparse(node.func), arguments
+
+
+class FunctionCatalog:
+    """Function definitions from a JSONL file, indexed for search, autocomplete and call validation.
+
+    Each line holds ``{"name", "description", "parameters"}``. Names are kept sorted for ``bisect``
+    prefix lookups, words of the name and description map to row ids in an inverted index, and a
+    function's argument validator is compiled once, on first use.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.reader = JsonlReader(path)
+        ids: dict[str, int] = {}
+        postings: dict[str, array] = {}
+        for idx, obj in enumerate(self.reader):
+            if not obj or not isinstance(obj.get("name"), str):
+                continue
+            ids[obj["name"]] = idx
+            for word in set(_words(obj["name"])) | set(_words(obj.get("description") or "")):
+                postings.setdefault(word, array("I")).append(idx)
+        self._ids = ids
+        self._names = sorted(ids, key=str.lower)
+        self._folded = [name.lower() for name in self._names]
+        self._postings = postings
+        self._name_of = {idx: name for name, idx in ids.items()}
+        self._name_words = {idx: set(_words(name)) for name, idx in ids.items()}
+        self._validators: dict[str, Validator] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+
+    def get(self, name: str) -> dict[str, Any] | None:
+        idx = self._ids.get(name)
+        return None if idx is None else self.reader[idx]
+
+    def complete(self, prefix: str, limit: int = 20) -> list[str]:
+        """Up to *limit* names starting with *prefix* (case-insensitive), in sorted order."""
+        prefix = prefix.lower()
+        start = bisect_left(self._folded, prefix)
+        names = []
+        for i in range(start, min(start + limit, len(self._names))):
+            if not self._folded[i].startswith(prefix):
+                break
+            names.append(self._names[i])
+        return names
+
+    def search(self, query: str, limit: int = 20) -> list[str]:
+        """Names ranked by how many query words they match; a word in the name counts double."""
+        scores: Counter[int] = Counter()
+        for word in set(_words(query)):
+            for idx in self._postings.get(word, ()):
+                scores[idx] += 2 if word in self._name_words[idx] else 1
+        return [self._name_of[idx] for idx, _ in scores.most_common(limit)]
+
+    def validator(self, name: str) -> Validator:
+        if name not in self._validators:
+            definition = self.get(name) or {}
+            self._validators[name] = compile_schema(definition.get("parameters") or {})
+        return self._validators[name]
+
+    def validate_call(self, text: str) -> tuple[str | None, dict[str, Any], list[str]]:
+        """Parse and check an authored call; returns ``(name, arguments, errors)``."""
+        try:
+            name, arguments = parse_call(text)
+        except ValueError as exc:
+            return None, {}, [str(exc)]
+        if name not in self._ids:
+            return name, arguments, [f"Unknown function {name!r}"]
+        return name, arguments, list(self.validator(name)(arguments, name))
+
+
+@lru_cache(maxsize=4)
+def _cached_catalog(path: Path, mtime_ns: int, size: int) -> FunctionCatalog:
+    return FunctionCatalog(path)
+
+
+def get_catalog(path: Path) -> FunctionCatalog | None:
+    """Shared catalog for *path*, rebuilt only when the file changes; ``None`` if it does not exist."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return _cached_catalog(path, stat.st_mtime_ns, stat.st_size)
@@ -0,0 +1,240 @@
+"""Generate synthetic conversations against an OpenAI-compatible chat completions endpoint.
+
+Usage::
+
+    python -m text.generation products.txt -o conversations.jsonl --assistant-name COMPASS --concurrency 16
+
+The endpoint is configured through ``SYNTHETIC_API_BASE`` (default ``http://localhost:8000/v1``),
+``SYNTHETIC_API_KEY`` and ``SYNTHETIC_MODEL``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections.abc import AsyncIterator, Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .conversation_cache import ConversationCache, get_conversation_cache
+from .prompting import build_synthetic_prompt
+
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class GenerationError(RuntimeError):
+    """Raised when the endpoint keeps failing after all retries (or fails non-retryably)."""
+
+
+@dataclass(frozen=True)
+class EndpointConfig:
+    """Connection settings for an OpenAI-compatible ``/chat/completions`` endpoint."""
+
+    base_url: str = "http://localhost:8000/v1"
+    api_key: str = ""
+    model: str = "default"
+    temperature: float = 0.8
+    timeout: float = 120.0
+    max_retries: int = 4
+    backoff: float = 0.5
+
+    @classmethod
+    def from_env(cls) -> EndpointConfig:
+        return cls(
+            base_url=os.environ.get("SYNTHETIC_API_BASE", cls.base_url),
+            api_key=os.environ.get("SYNTHETIC_API_KEY", ""),
+            model=os.environ.get("SYNTHETIC_MODEL", cls.model),
+        )
+
+
+@dataclass
+class GenerationStats:
+    requests: int = 0
+    retries: int = 0
+    failures: int = 0
+    latencies: list[float] = field(default_factory=list)
+
+
+class ConversationClient:
+    """Asyncio client with a concurrency cap and retry/backoff around each request.
+
+    The blocking HTTP call runs on a thread pool sized to *concurrency*, so only :mod:`urllib` is
+    needed; the semaphore bounds the in-flight requests to the same number.
+    """
+
+    def __init__(self, config: EndpointConfig, *, concurrency: int = 8,
+                 cache: ConversationCache | None = None) -> None:
+        self.config = config
+        self.concurrency = concurrency
+        self.cache = cache
+        self.stats = GenerationStats()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._executor = ThreadPoolExecutor(concurrency, thread_name_prefix="generation")
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _post(self, prompt: str) -> dict[str, Any]:
+        body = json.dumps({
+            "model": self.config.model,
+            "temperature": self.config.temperature,
+            "messages": [{"role": "user", "content": prompt}],
+        }).encode()
+        headers = {"Content-Type": "application/json"}
+        if self.config.api_key:
+            headers["Authorization"] = f"Bearer {self.config.api_key}"
+        request = urllib.request.Request(f"{self.config.base_url.rstrip('/')}/chat/completions", body, headers)
+        with urllib.request.urlopen(request, timeout=self.config.timeout) as response:
+            return json.load(response)
+
+    async def generate(self, prompt: str) -> str:
+        """Return the conversation for *prompt*, from the cache when possible, else from the endpoint."""
+        if self.cache is not None and (cached := self.cache.get(prompt, self.config.model)) is not None:
+            return cached
+        conversation = await self._request(prompt)
+        if self.cache is not None:
+            self.cache.put(prompt, conversation, self.config.model)
+        return conversation
+
+    async def _request(self, prompt: str) -> str:
+        async with self._semaphore:
+            for attempt in range(self.config.max_retries + 1):
+                started = time.perf_counter()
+                self.stats.requests += 1
+                try:
+                    payload = await asyncio.get_running_loop().run_in_executor(self._executor, self._post, prompt)
+                    self.stats.latencies.append(time.perf_counter() - started)
+                    return payload["choices"][0]["message"]["content"].strip()
+                except urllib.error.HTTPError as exc:
+                    if exc.code not in _RETRYABLE_STATUS or attempt == self.config.max_retries:
+                        self.stats.failures += 1
+                        raise GenerationError(f"HTTP {exc.code} from {self.config.base_url}") from exc
+                except (urllib.error.URLError, TimeoutError, ConnectionError) as exc:
+                    if attempt == self.config.max_retries:
+                        self.stats.failures += 1
+                        raise GenerationError(f"Could not reach {self.config.base_url}: {exc}") from exc
+                except (KeyError, IndexError, TypeError, json.JSONDecodeError) as exc:
+                    self.stats.failures += 1
+                    raise GenerationError("Malformed chat completion response") from exc
+                self.stats.retries += 1
+                # Exponential backoff with full jitter keeps retrying clients from synchronising.
+                await asyncio.sleep(random.uniform(0, self.config.backoff * 2 ** attempt))
+        raise AssertionError("unreachable")
+
+    async def generate_many(self, prompts: Iterable[tuple[str, str]], *,
+                            queue_size: int | None = None) -> AsyncIterator[tuple[str, str | None, str | None]]:
+        """Fan out ``(key, prompt)`` pairs and yield ``(key, conversation, error)`` as they finish.
+
+        Prompts are fed through a bounded queue (``2 * concurrency`` by default), so a huge input is
+        never materialised and a slow consumer applies backpressure to the producer.
+        """
+        workers = self.concurrency
+        queue: asyncio.Queue[tuple[str, str] | None] = asyncio.Queue(queue_size or 2 * workers)
+        results: asyncio.Queue[tuple[str, str | None, str | None] | None] = asyncio.Queue(queue_size or 2 * workers)
+
+        async def produce() -> None:
+            try:
+                for item in prompts:
+                    await queue.put(item)
+            finally:
+                # Stop the workers even when *prompts* raises; the error is re-raised below.
+                for _ in range(workers):
+                    await queue.put(None)
+
+        async def work() -> None:
+            try:
+                while (item := await queue.get()) is not None:
+                    key, prompt = item
+                    try:
+                        conversation = await self.generate(prompt)
+                    except GenerationError as exc:
+                        await results.put((key, None, str(exc)))
+                    except Exception as exc:
+                        await results.put((key, None, f"{type(exc).__name__}: {exc}"))
+                    else:
+                        await results.put((key, conversation, None))
+            finally:
+                # Always report this worker as finished, or the consumer below would wait forever.
+                await results.put(None)
+
+        producer = asyncio.create_task(produce())
+        tasks = [producer] + [asyncio.create_task(work()) for _ in range(workers)]
+        try:
+            finished = 0
+            while finished < workers:
+                result = await results.get()
+                if result is None:
+                    finished += 1
+                else:
+                    yield result
+            if producer.done() and not producer.cancelled() and producer.exception() is not None:
+                raise producer.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def generate_conversation(prompt: str, config: EndpointConfig | None = None,
+                          cache: ConversationCache | None = None) -> str:
+    """Blocking convenience wrapper for a single prompt (used from the Streamlit page)."""
+    client = ConversationClient(config or EndpointConfig.from_env(), concurrency=1, cache=cache)
+    try:
+        return asyncio.run(client.generate(prompt))
+    finally:
+        client.close()
+
+
+async def _generate_file(products: Iterable[str], build_prompt: Callable[[str], str], target: Path,
+                         client: ConversationClient) -> tuple[int, int]:
+    ok = failed = 0
+    with target.open("w", encoding="utf-8") as out:
+        async for product, conversation, error in client.generate_many((p, build_prompt(p)) for p in products):
+            out.write(json.dumps({"product": product, "conversation": conversation, "error": error},
+                                 ensure_ascii=False) + "\n")
+            ok, failed = (ok + 1, failed) if error is None else (ok, failed + 1)
+    return ok, failed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("products", type=Path, help="text file with one product title per line")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="JSONL file to write")
+    parser.add_argument("--assistant-name", default="Assistant")
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--examples", type=Path, help="text file with the style examples to embed in each prompt")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--no-cache", action="store_true", help="always call the endpoint, bypassing the cache")
+    args = parser.parse_args(argv)
+
+    examples = args.examples.read_text(encoding="utf-8") if args.examples else ""
+
+    def build_prompt(product: str) -> str:
+        return build_synthetic_prompt(args.turns, args.assistant_name, product, examples).text
+
+    cache = None if args.no_cache else get_conversation_cache()
+    client = ConversationClient(EndpointConfig.from_env(), concurrency=args.concurrency, cache=cache)
+    started = time.perf_counter()
+    try:
+        with args.products.open("r", encoding="utf-8") as fp:
+            products = (line.strip() for line in fp if line.strip())
+            ok, failed = asyncio.run(_generate_file(products, build_prompt, args.output, client))
+    finally:
+        client.close()
+    elapsed = time.perf_counter() - started
+    print(f"{ok} generated, {failed} failed, {client.stats.retries} retries in {elapsed:.1f}s -> {args.output}",
+          file=sys.stderr)
+    if cache is not None:
+        print(f"cache: {cache.stats()}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import random
+import struct
+from array import array
+from collections.abc import Callable, Iterator, Sequence
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+_MAGIC = b"JLIX"
+_VERSION = 2
+# magic, version, source mtime_ns, source size, item count
+_HEADER = struct.Struct("<4sIqQQ")
+INDEX_SUFFIX = ".idx"
+
+
+def sidecar_path(path: Path, suffix: str) -> Path:
+    """Location of a derived array persisted next to *path*, e.g. ``data.jsonl.idx``."""
+    return path.with_name(path.name + suffix)
+
+
+def _scan_offsets(path: Path) -> array:
+    """Return the start offset of every non-blank line plus a trailing end-of-file sentinel."""
+    offsets = array("Q")
+    size = path.stat().st_size
+    if not size:
+        offsets.append(0)
+        return offsets
+
+    with path.open("rb") as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            end = mm.find(b"\n", start)
+            end = size if end == -1 else end + 1
+            if mm[start:end].strip():
+                offsets.append(start)
+            start = end
+        offsets.append(size)
+    return offsets
+
+
+def _write_sidecar(path: Path, suffix: str, stat: os.stat_result, values: array) -> None:
+    target = sidecar_path(path, suffix)
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    try:
+        with tmp.open("wb") as fp:
+            fp.write(_HEADER.pack(_MAGIC, _VERSION, stat.st_mtime_ns, stat.st_size, len(values)))
+            values.tofile(fp)
+        os.replace(tmp, target)
+    except OSError:
+        # Read-only data directories still work, the sidecar just isn't persisted.
+        tmp.unlink(missing_ok=True)
+
+
+def _read_sidecar(path: Path, suffix: str, stat: os.stat_result, typecode: str) -> memoryview | None:
+    try:
+        fp = sidecar_path(path, suffix).open("rb")
+    except FileNotFoundError:
+        return None
+
+    with fp:
+        header = fp.read(_HEADER.size)
+        if len(header) != _HEADER.size:
+            return None
+        magic, version, mtime_ns, size, count = _HEADER.unpack(header)
+        if (magic, version, mtime_ns, size) != (_MAGIC, _VERSION, stat.st_mtime_ns, stat.st_size):
+            return None
+        if os.fstat(fp.fileno()).st_size != _HEADER.size + array(typecode).itemsize * count:
+            return None
+        mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    # The memoryview keeps the mapping alive for as long as it is referenced.
+    return memoryview(mm)[_HEADER.size:].cast(typecode)
+
+
+def load_sidecar(path: Path, suffix: str, typecode: str, build: Callable[[], array]) -> memoryview:
+    """Return the memory-mapped array persisted next to *path*, (re)building it when *path* has changed."""
+    stat = path.stat()
+    values = _read_sidecar(path, suffix, stat, typecode)
+    if values is None:
+        built = build()
+        _write_sidecar(path, suffix, stat, built)
+        values = _read_sidecar(path, suffix, stat, typecode) or memoryview(built)
+    return values
+
+
+class JsonlReader(Sequence):
+    """Random access to the lines of a ``.jsonl`` file through ``mmap`` and a persisted offset index.
+
+    Only the lines that are indexed into are ever parsed, so resident memory stays flat no matter how
+    large the file is; the kernel pages bytes in and out as needed.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._offsets = load_sidecar(path, INDEX_SUFFIX, "Q", lambda: _scan_offsets(path))
+        self._fp = path.open("rb")
+        self._mm = mmap.mmap(self._fp.fileno(), 0, access=mmap.ACCESS_READ) if path.stat().st_size else b""
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def line(self, idx: int) -> bytes:
+        """Raw bytes of the *idx*‑th non-blank line."""
+        return self._mm[self._offsets[idx]:self._offsets[idx + 1]]
+
+    def __getitem__(self, idx: int) -> dict[str, Any] | None:
+        """Parse the *idx*‑th line, returning ``None`` when it is not valid JSON."""
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+        try:
+            return json.loads(self.line(idx))
+        except json.JSONDecodeError:
+            return None
+
+    def __iter__(self) -> Iterator[dict[str, Any] | None]:
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def sample(self, k: int) -> list[dict[str, Any]]:
+        """Parse *k* random lines (or all of them, for short files)."""
+        chosen = random.sample(range(len(self)), min(k, len(self)))
+        return [record for record in map(self.__getitem__, chosen) if record is not None]
+
+
+class JsonlField(Sequence):
+    """Lazy column view over one *key* of a :class:`JsonlReader`; rows lacking it read as ``""``.
+
+    Indexing parses one row; slicing parses the selected rows and returns them as a list.
+    """
+
+    def __init__(self, reader: JsonlReader, key: str) -> None:
+        self.reader = reader
+        self.key = key
+
+    def __len__(self) -> int:
+        return len(self.reader)
+
+    def __getitem__(self, idx: int | slice) -> str | list[str]:
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        record = self.reader[idx]
+        return record.get(self.key, "") if record else ""
+
+
+@lru_cache(maxsize=16)
+def _cached_reader(path: Path, mtime_ns: int, size: int) -> JsonlReader:
+    return JsonlReader(path)
+
+
+def get_reader(path: Path) -> JsonlReader:
+    """Shared reader for *path*, replaced when the file changes on disk.
+
+    The cache is bounded and keyed on ``(mtime, size)``, so rewritten shards get a fresh mapping
+    and readers of old versions are dropped (closing their file and ``mmap``) once evicted.
+    Raises :class:`FileNotFoundError` when *path* does not exist.
+    """
+    stat = path.stat()
+    return _cached_reader(path, stat.st_mtime_ns, stat.st_size)
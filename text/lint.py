@@ -0,0 +1,115 @@
+"""Validate JSONL data shards against the record rules in parallel.
+
+Usage::
+
+    python -m text.lint                       # every data/*.jsonl record shard
+    python -m text.lint export/*.jsonl --workers 16 --task intent
+
+Exits with status 1 when any error rule is violated; warnings are reported but do not fail the run.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .function_catalog import FUNCTION_CATALOG
+from .records import RECORD_BUILDERS
+from .validation import ValidationReport, validate_lines
+
+DATA_DIR = Path("data")
+
+
+def _byte_ranges(path: Path, shard_bytes: int) -> Iterator[tuple[int, int]]:
+    """Split *path* into ``[start, end)`` ranges of roughly *shard_bytes*, each ending on a line boundary."""
+    size = path.stat().st_size
+    with path.open("rb") as fp:
+        start = 0
+        while start < size:
+            fp.seek(min(start + shard_bytes, size))
+            fp.readline()
+            end = min(fp.tell(), size)
+            yield start, end
+            start = end
+
+
+def _lines(path: Path, start: int, end: int) -> Iterator[bytes]:
+    with path.open("rb") as fp:
+        fp.seek(start)
+        while fp.tell() < end and (line := fp.readline()):
+            yield line
+
+
+def lint_shard(path: Path, start: int, end: int, task: str | None) -> ValidationReport:
+    """Worker entry point: validate the lines of one byte range."""
+    return validate_lines(_lines(path, start, end), task)
+
+
+def lint_files(paths: list[Path], *, task: str | None = None, workers: int | None = None,
+               shard_bytes: int = 64 << 20) -> dict[Path, ValidationReport | ValueError]:
+    """Validate every file, fanning byte-range shards out over a process pool.
+
+    A file whose records have no recognisable task maps to the :class:`ValueError` explaining why.
+    """
+    shards = [(path, start, end) for path in paths for start, end in _byte_ranges(path, shard_bytes)]
+    reports: dict[Path, ValidationReport | ValueError] = {path: ValidationReport() for path in paths}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(lint_shard, path, start, end, task) for path, start, end in shards]
+        # Shards come back in file order, so row offsets for the sample line numbers accumulate correctly.
+        for (path, _, _), future in zip(shards, futures):
+            report = reports[path]
+            if isinstance(report, ValueError):
+                continue
+            try:
+                report.merge(future.result(), row_offset=report.rows)
+            except ValueError as exc:
+                reports[path] = exc
+    return reports
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*", type=Path, help="JSONL shards (default: data/*.jsonl)")
+    parser.add_argument("--task", choices=sorted(RECORD_BUILDERS), help="force the rule set instead of detecting it")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--shard-mb", type=int, default=64, help="approximate size of the work unit per process")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or sorted(path for path in DATA_DIR.glob("*.jsonl") if path.name != FUNCTION_CATALOG)
+    if not paths:
+        print("No JSONL files to lint", file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+    reports = lint_files(paths, task=args.task, workers=args.workers, shard_bytes=args.shard_mb << 20)
+    elapsed = time.perf_counter() - started
+
+    total_rows = total_errors = 0
+    for path, report in reports.items():
+        if isinstance(report, ValueError):
+            print(f"{path}: skipped, {report}")
+            continue
+        total_rows += report.rows
+        total_errors += sum(report.violations.values())
+        status = "ok" if report.ok else f"{sum(report.violations.values())} violations"
+        if report.warnings:
+            status += f", {sum(report.warnings.values())} warnings"
+        print(f"{path}: {report.rows} rows, {status}")
+        for label, counts in (("", report.violations), ("warning: ", report.warnings)):
+            for name, count in counts.most_common():
+                rows = ", ".join(str(row + 1) for row in report.samples.get(name, []))
+                print(f"  {label + name:<33} {count:>8}  {report.messages.get(name, '')} (records {rows}…)")
+
+    total_bytes = sum(path.stat().st_size for path in paths)
+    print(f"{total_rows} rows / {total_bytes / 1e6:.1f} MB in {elapsed:.2f}s "
+          f"({total_rows / max(elapsed, 1e-9):,.0f} rows/s, {total_bytes / 1e6 / max(elapsed, 1e-9):.1f} MB/s) "
+          f"with {args.workers} workers", file=sys.stderr)
+    return 1 if total_errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
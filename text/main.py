@@ -1,26 +1,69 @@
 from __future__ import annotations
 
 import json
-import random
 import sys
+from collections.abc import Sequence
 from dataclasses import dataclass
 from functools import lru_cache
+from itertools import chain, islice
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import streamlit as st
 
-from .prompts import *
+from .conversation_cache import get_conversation_cache
+from .conversation import parse_conversation
+from .corpus import get_corpus
+from .jsonl_index import JsonlField, get_reader
+from .prompting import build_synthetic_prompt, estimate_tokens
+from .records import BFCL_TASK, INTENT_TASK, TEN_TASK, TEXT2OPTIONS_TASK
+from .session import TurnLog
+from .stats import bucket_order
+from .record_store import RECORD_STORE, TaskView, get_task_view, new_record_id
+from .sink import DATASET_DIR, DatasetSink, get_sink
+from .timing import timed, traced
+from .validation import review_record
+
+# numpy (near-duplicate index, BM25 retrieval) and the generation client are imported where they are
+# first needed, so importing this module, and with it start-up and every page, stays cheap.
+if TYPE_CHECKING:
+    from .dedup import NearDuplicateIndex
+
+EXAMPLE_STRATEGIES = ("Random", "Similar")
+EXAMPLE_LIMITS = ("Count", "Token budget")
+# How many ranked (and, separately, random) rows token-budget packing may consider.
+_BUDGET_CANDIDATES = 64
+
+
+@dataclass(frozen=True)
+class ExampleSource:
+    """Where the style examples for a task's synthetic prompt come from."""
+
+    file_name: str
+    history_key: str
+    title_key: str
+    label_keys: tuple[str, ...] = ()
+
 
 _SESSION_KEYS = {
-    "chat_history": list[dict[str, str]],
+    # Turns keyed by a per-session id that never changes, so removal stays O(1) and correct across pages.
+    "chat_history": TurnLog,
     "new_user_input": str,
     "new_assistant_output": str,
+    # Text inputs of the page forms, read by the output fragments before their widgets may exist.
+    "intent_product_attributes": str,
+    "intent_customer_utterance": str,
+    "txt2_product_type": str,
+    "txt2_question": str,
+    "txt2_options": str,
+    "txt2_input": str,
 }
 
 # DIR = Path(__file__).resolve()
 # sys.path.append(DIR.parent)
 
 DATA_DIR = Path("data")
+DATASET_TASKS = (INTENT_TASK, TEN_TASK, TEXT2OPTIONS_TASK, BFCL_TASK)
 
 
 def init_state() -> None:
@@ -40,49 +83,201 @@ def add_turn() -> None:
         st.warning("Both the User Prompt and Assistant Response are required", icon="⚠️")
         return
 
-    st.session_state.chat_history.append({"user_input": user, "assistant_output": assistant})
+    st.session_state.chat_history.add(user, assistant)
     st.session_state.new_user_input = ""
     st.session_state.new_assistant_output = ""
+    # Jump to the page holding the new turn.
+    st.session_state.chat_history_page = _page_count(len(st.session_state.chat_history))
+
+
+def remove_turn(turn_id: int) -> None:
+    """Delete the turn with the stable id *turn_id* from the history."""
+    if not st.session_state.chat_history.remove(turn_id):
+        st.error("Invalid turn id", icon="❌")
+
+
+@lru_cache(maxsize=1)
+def _dedup_index() -> NearDuplicateIndex:
+    """Process-wide near-duplicate index seeded from the example corpora and earlier submissions.
+
+    Submissions come from both dataset backends, since each session picks its own: the JSONL sinks
+    and, when it exists, the SQLite store (keyed by record id).
+    """
+    from .dedup import NearDuplicateIndex
+
+    index = NearDuplicateIndex()
+    for path, key in (
+            (DATA_DIR / "intentData_100.jsonl", "ChatHistory"),
+            (DATA_DIR / "Text2Options_100.jsonl", "ConversationHistory"),
+            (get_sink(INTENT_TASK).path, "ChatHistory"),
+            (get_sink(TEXT2OPTIONS_TASK).path, "ConversationHistory"),
+    ):
+        index.add_jsonl(path, key)
+    if (DATASET_DIR / RECORD_STORE).exists():
+        for task, key in ((INTENT_TASK, "ChatHistory"), (TEXT2OPTIONS_TASK, "ConversationHistory")):
+            view = get_task_view(task)
+            for record_id, body in view.store.bodies(task):
+                if conversation := json.loads(body).get(key):
+                    index.add(view.record_key(record_id), conversation)
+    return index
+
+
+DATASET_BACKENDS = ("JSONL files", "SQLite store")
+
+
+def get_dataset(task: str) -> DatasetSink | TaskView:
+    """The *task* dataset of the backend chosen in the sidebar: a JSONL sink or the shared SQLite store."""
+    if st.session_state.get("dataset_backend") == DATASET_BACKENDS[1]:
+        return get_task_view(task)
+    return get_sink(task)
+
+
+def emit_record(task: str, record: dict, conversation: str | None = None) -> bool:
+    """Append *record* to the *task* dataset when saving is switched on in the sidebar; returns whether it was saved.
+
+    When *conversation* is given it is checked against every known conversation first, and a
+    near-duplicate is flagged (and, unless allowed in the sidebar, not saved). With saving off the
+    check still runs, without adding the conversation to the index.
+    """
+    if not st.session_state.get("save_to_dataset", True):
+        if conversation and (matches := _dedup_index().query(conversation)):
+            source, similarity = matches[0]
+            st.warning(f"Conversation is a near-duplicate of `{source}` (~{similarity:.0%} similar)", icon="⚠️")
+        return False
+    sink = get_dataset(task)
+    # Store records are keyed by the id they are saved under; JSONL records by their line number.
+    record_id = new_record_id() if isinstance(sink, TaskView) else None
+    if conversation:
+        allow = not st.session_state.get("block_near_duplicates", True)
+        key = sink.record_key(record_id) if record_id else f"{sink.path.name}:{sink.count + 1}"
+        matches = _dedup_index().check_and_add(key, conversation, add_duplicates=allow)
+        if matches:
+            source, similarity = matches[0]
+            st.warning(f"Conversation is a near-duplicate of `{source}` (~{similarity:.0%} similar)"
+                       + ("" if allow else "; it was not saved to the dataset."), icon="⚠️")
+            if not allow:
+                return False
+    count = sink.append(record, record_id) if record_id else sink.append(record)
+    st.toast(f"Saved to {task} dataset ({count} records)", icon="💾")
+    return True
+
+
+def passes_validation(record: dict, task: str) -> bool:
+    """Show every rule *record* breaks; only error rules keep it from being saved or offered for download."""
+    errors, warnings = review_record(record, task)
+    for error in errors:
+        st.error(error, icon="❌")
+    for warning in warnings:
+        st.warning(warning, icon="⚠️")
+    return not errors
+
+
+@traced()
+def render_dataset_sidebar() -> None:
+    """Sidebar toggle for the append-only datasets plus their running record counts."""
+    st.sidebar.toggle("Append generated records to dataset", value=True, key="save_to_dataset")
+    st.sidebar.toggle("Block near-duplicate conversations", value=True, key="block_near_duplicates")
+    st.sidebar.radio("Dataset backend", DATASET_BACKENDS, horizontal=True, key="dataset_backend",
+                     help="*SQLite store* is one WAL database shared by every session; "
+                          "export with `python -m text.record_store export <task> -o <file>`")
+    for task in DATASET_TASKS:
+        sink = get_dataset(task)
+        st.sidebar.caption(f"{task} · `{sink.path}`: **{sink.count}** records ({sink.pending} pending flush)")
+    render_label_balance_sidebar()
+
+
+def _count_table(rows: Sequence[tuple[str, int]], label: str) -> None:
+    st.dataframe(
+        {label: [name for name, _ in rows], "count": [count for _, count in rows]},
+        column_config={"count": st.column_config.ProgressColumn(
+            format="%d", min_value=0, max_value=max((count for _, count in rows), default=0) or 1)},
+        hide_index=True, use_container_width=True,
+    )
 
 
-def remove_turn(idx: int) -> None:
-    """Delete the *idx*‑th turn from the history."""
-    try:
-        st.session_state.chat_history.pop(idx)
-    except IndexError:
-        st.error("Invalid turn index", icon="❌")
-
-
-@lru_cache(maxsize=None)
-def load_jsonl(file_name: str, key: str) -> list[str]:
-    """Read a ``.jsonl`` file once and cache the requested *key* field."""
+@traced()
+def render_label_balance_sidebar() -> None:
+    """Per-label counts of the saved datasets, read from the sinks' running aggregates (no rescans)."""
+    with st.sidebar.expander("Label balance"):
+        for task in DATASET_TASKS:
+            stats = get_dataset(task).stats
+            if not stats.rows:
+                continue
+            st.markdown(f"**{task}** · {stats.rows} records")
+            for name in stats.labels:
+                _count_table(stats.balance(name), name)
+                if underfilled := stats.underfilled(name):
+                    st.warning(f"Under-filled {name}: " + ", ".join(underfilled), icon="⚠️")
+            for name, cells in stats.crosstabs.items():
+                st.caption(name)
+                table: dict[str, dict[str, int]] = {}
+                for cell, count in cells.items():
+                    row, column = cell.split("|", 1)
+                    table.setdefault(column, {})[row] = count
+                st.dataframe(table, use_container_width=True)
+            if stats.turns:
+                _count_table(sorted(stats.turns.items(), key=bucket_order), "turns")
+            if stats.characters:
+                _count_table(sorted(stats.characters.items(), key=bucket_order), "history characters")
+
+
+@traced()
+def load_jsonl(file_name: str, key: str) -> Sequence[str]:
+    """Return a lazy, mmap-backed view of the *key* field of a ``.jsonl`` file; rows parse on access.
+
+    The view is a read-only sequence, not a list: indexing parses that row, slicing returns a list of
+    the selected rows, and iterating it again parses every row again. Rows without *key* read as ``""``.
+    """
     path = DATA_DIR / file_name
-    if not path.exists():
+    try:
+        return JsonlField(get_reader(path), key)
+    except FileNotFoundError:
         st.error(f"File not found: {path}")
         return []
 
-    with path.open("r", encoding="utf‑8") as fp:
-        return [json.loads(line).get(key, "") for line in fp if key in line]
 
+CHAT_HISTORY_PAGE_SIZE = 10
 
-def chat_history_fragment(*, max_turns: int = 20) -> None:
-    """Display a collapsible summary of recent chat turns."""
-    for idx, turn in enumerate(st.session_state.chat_history[-max_turns:]):
-        with st.expander(f"Turn {idx + 1}"):
-            st.markdown(f"**User:** {turn['user_input']}")
-            st.markdown(f"**Assistant:** {turn['assistant_output']}")
+
+def _page_count(turns: int, page_size: int = CHAT_HISTORY_PAGE_SIZE) -> int:
+    return max(1, -(-turns // page_size))
+
+
+def chat_history_fragment(*, page_size: int = CHAT_HISTORY_PAGE_SIZE) -> None:
+    """Display one page of chat turns (reruns within :func:`add_manual_turn_fragment`).
+
+    Only the *page_size* turns on the selected page are rendered, so the payload stays constant as
+    the conversation grows.
+    """
+    history: TurnLog = st.session_state.chat_history
+    pages = _page_count(len(history), page_size)
+    # Default to the newest page and clamp after removals shrink the history.
+    if st.session_state.setdefault("chat_history_page", pages) > pages:
+        st.session_state.chat_history_page = pages
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages,
+                           key="chat_history_page") if pages > 1 else 1
+
+    start = (page - 1) * page_size
+    for position, (turn_id, (user, assistant)) in enumerate(islice(history.items(), start, start + page_size),
+                                                            start=start + 1):
+        with st.expander(f"Turn {position}"):
+            st.markdown(f"**User:** {user}")
+            st.markdown(f"**Assistant:** {assistant}")
             st.button(
                 "🗑️ Remove",
-                key=f"rm_{idx}",
+                key=f"rm_{turn_id}",
                 help="Delete this turn",
                 on_click=remove_turn,
-                args=(idx,),
+                args=(turn_id,),
                 use_container_width=True
             )
 
 
+@st.fragment
+@timed("manual turns")
 def add_manual_turn_fragment() -> None:
-    """Render controls for *manual* turn entry."""
+    """Render controls for *manual* turn entry; adding or removing a turn reruns only this fragment."""
+    init_state()
     with st.expander("Add Turns Manually"):
         chat_history_fragment()
         with st.form("add_turn_form", clear_on_submit=False):
@@ -92,240 +287,127 @@ def add_manual_turn_fragment() -> None:
             st.form_submit_button("Add Turn", on_click=add_turn)
 
 
-def add_auto_turn_fragment(title: str, assistant_name: str, examples: str, turns_to_generate: int) -> None:
-    """Show the LLM prompt for *automatic* turn generation."""
-    prompt = SYNTHETIC_DATA_PROMPT.format(
-        n=turns_to_generate,
-        assistant_name=assistant_name,
-        title=title,
-        examples=examples,
-    ).strip()
-    st.code(prompt, wrap_lines=True, height=200)
-    st.text_area(
-        "Reviewed Synthetic Conversation",
-        key=f"{assistant_name.lower()}_synthetic_conversation",
-        height=200,
-        placeholder="Paste the generated conversation from LLM…",
-    )
-
-
-def render_ten_classification_page() -> None:
-    st.subheader("Fixed Instructions")
-    with st.expander("General Instructions"):
-        st.markdown(TEN_GENERAL_INSTRUCTIONS)
-    with st.expander("Detailed Instructions"):
-        st.markdown(TEN_DETAILED_INSTRUCTIONS)
-
-    st.subheader("Per-Sample Section")
-    render_ten_classification_form()
-
-
-@dataclass
-class ProductDetailInput:
-    """Container for product detail fields."""
-
-    keywords: str = ""
-    title: list[str] = None
-    bullet_points: list[str] = None
-    product_type: list[str] = None
-    gl_product_type: list[str] = None
-    brand: list[str] = None
-    color: list[str] = None
-    size: list[str] = None
-    ground_truth: str = ""
-
-    def to_json(self) -> str:
-        return json.dumps(self.__dict__, indent=2, ensure_ascii=False)
-
-
-def render_ten_classification_form() -> None:
-    with st.form("ten_form"):
-        data = ProductDetailInput(
-            keywords=st.text_input("Search Query"),
-            title=st.text_area("Product Title").strip().splitlines(),
-            brand=st.text_area("Product Brand").strip().splitlines(),
-            bullet_points=st.text_area("Product Bullet Points").strip().splitlines(),
-            product_type=st.text_area("Product Type").strip().splitlines(),
-            gl_product_type=st.text_area("General Ledger Category").strip().splitlines(),
-            color=st.text_area("Product Color").strip().splitlines(),
-            size=st.text_area("Product Size").strip().splitlines(),
-            ground_truth=st.selectbox("ESCI Categories", TEN_ESCI_CATEGORIES),
-        )
-
-        if st.form_submit_button("Generate Product JSON", use_container_width=True):
-            with st.expander("JSON Output"):
-                st.code(data.to_json(), language="json", wrap_lines=True)
-    st.download_button(
-        "📥 Download JSON",
-        data=data.to_json(),
-        file_name="product_details.json",
-        mime="application/json",
-        use_container_width=True
-    )
+_BALANCED = "All labels (balanced)"
 
 
-def render_intent_classification_page() -> None:
-    st.subheader("Fixed Instructions")
-    with st.expander("General Instructions"):
-        st.markdown(INTENT_GENERAL_INSTRUCTIONS)
-    with st.expander("Intent Definitions"):
-        st.code(INTENT_DEFINITION, language="xml")
-    with st.expander("Ambiguity Level Definitions"):
-        st.code(INTENT_AMBIGUITY_LEVEL_DEFINITION, language="xml")
-    with st.expander("K-Shot Examples"):
-        st.code(INTENT_K_SHOT_EXAMPLES, language="xml")
-    with st.expander("Instruction Reminder"):
-        st.markdown(INTENT_INSTRUCTIONS_REMINDER)
+def _stratify_options(source: ExampleSource) -> tuple[str | None, str | None]:
+    """Advanced-settings selectors for drawing examples per label; returns ``(label key, label or None)``."""
+    if not source.label_keys:
+        return None, None
+    stratify = st.selectbox("Stratify examples by", ("None", *source.label_keys),
+                            help="Draw examples evenly across the labels of this field, or only from one label")
+    if stratify == "None":
+        return None, None
+    corpus = get_corpus(DATA_DIR / source.file_name, source.title_key, source.history_key, source.label_keys)
+    buckets = corpus.label_buckets[stratify] if corpus else {}
+    label = st.selectbox("Label", (_BALANCED, *sorted(buckets)),
+                         format_func=lambda value: value if value == _BALANCED else f"{value} ({len(buckets[value])})")
+    return stratify, None if label == _BALANCED else label
 
-    st.subheader("Per-Sample Section")
-    render_intent_classification_form()
 
+def _generate_into(prompt: str, key: str) -> None:
+    """Button callback: fill the *key* text area with a conversation generated for *prompt*."""
+    from .generation import GenerationError, generate_conversation
 
-def _auto_examples(file_name: str, history_key: str, k: int, title_key: str, divider: str = "\n---\n\n", ) -> str:
+    try:
+        st.session_state[key] = generate_conversation(prompt, cache=get_conversation_cache())
+    except GenerationError as exc:
+        st.session_state._generation_error = str(exc)
+
+
+@st.fragment
+@timed("prompt generator")
+def add_auto_turn_fragment(source: ExampleSource, title: str, assistant_name: str) -> None:
+    """Pick style examples and show the LLM prompt for *automatic* turn generation.
+
+    Changing the advanced settings reruns only this fragment, so example sampling never redraws the page.
+    """
+    with st.expander("Generate Prompt"):
+        with st.expander("Advanced"):
+            limit = st.radio("Limit examples by", EXAMPLE_LIMITS, horizontal=True)
+            if limit == "Token budget":
+                token_budget = st.number_input("Example token budget", min_value=100, value=1500, step=100)
+                examples_to_retrieve = 0
+            else:
+                token_budget = None
+                examples_to_retrieve = st.number_input("Examples to retrieve", value=5)
+            turns_to_generate = st.number_input("Turns to generate", value=3)
+            strategy = st.radio("Example selection", EXAMPLE_STRATEGIES, horizontal=True,
+                                help="*Similar* ranks examples by BM25 similarity to the product")
+            stratify, label = _stratify_options(source)
+
+        examples = _auto_examples(source.file_name, source.history_key, int(examples_to_retrieve), source.title_key,
+                                  label_keys=source.label_keys, strategy=strategy, query=title,
+                                  token_budget=token_budget and int(token_budget), stratify=stratify, label=label)
+        prompt = build_synthetic_prompt(int(turns_to_generate), assistant_name, title, examples)
+        st.caption(f"≈ {prompt.tokens:,} tokens ({len(prompt.text):,} characters)")
+        st.code(prompt.text, wrap_lines=True, height=200)
+        conversation_key = f"{assistant_name.lower()}_synthetic_conversation"
+        st.button("✨ Generate with model", on_click=_generate_into, args=(prompt.text, conversation_key),
+                  help="Send the prompt to the endpoint configured via SYNTHETIC_API_BASE / SYNTHETIC_MODEL")
+        if error := st.session_state.pop("_generation_error", None):
+            st.error(error, icon="❌")
+        cache = get_conversation_cache().stats()
+        st.caption(f"Conversation cache: {cache['hits']} hits · {cache['misses']} misses · {cache['entries']} entries")
+        st.text_area(
+            "Reviewed Synthetic Conversation",
+            key=conversation_key,
+            height=200,
+            placeholder="Paste the generated conversation from LLM…",
+        )
+        if pasted := st.session_state.get(conversation_key):
+            parsed = parse_conversation(pasted, assistant_name)
+            st.caption(f"{len(parsed)} turns · {parsed.exchanges} customer/{assistant_name} exchanges")
+            if not parsed.is_alternating():
+                st.warning(f"Turns should alternate Customer → {assistant_name}, starting with the customer",
+                           icon="⚠️")
+            elif parsed.exchanges != int(turns_to_generate):
+                st.info(f"Expected {int(turns_to_generate)} exchanges, found {parsed.exchanges}")
+
+
+@traced()
+def _auto_examples(file_name: str, history_key: str, k: int, title_key: str, divider: str = "\n---\n\n",
+                   label_keys: tuple[str, ...] = (), strategy: str = "Random", query: str = "",
+                   token_budget: int | None = None, stratify: str | None = None, label: str | None = None) -> str:
+    """Pick style examples from the shared corpus, at random or ranked by similarity to *query*.
+
+    Either *k* examples are taken, or, with *token_budget*, as many as fit into that many tokens
+    using the corpus' precomputed per-row token lengths. With *stratify* (a label key) random picks
+    are spread evenly over its labels, or restricted to *label* (ranked picks are filtered to it too).
+    """
     path = DATA_DIR / file_name
-    if not path.exists():
+    corpus = get_corpus(path, title_key, history_key, label_keys)
+    if corpus is None:
         st.error(f"File not found: {path}")
         return ""
 
-    examples: list[str] = []
-    with path.open("r", encoding="utf-8") as fp:
-        for raw in fp:
-            try:
-                obj = json.loads(raw)
-            except json.JSONDecodeError:
-                continue
-
-            history = obj.get(history_key)
-            if not history:
-                continue
-
-            title = obj.get(title_key, "").strip()
-            if title and history:
-                chat_turn = f"Product: {title}\n\nConversation:\n {history}"
-
-            examples.append(chat_turn)
-
-    if not examples:
+    if not len(corpus):
         return ""
 
-    chosen = random.sample(examples, k) if len(examples) >= k else examples
-    return divider.join(chosen)
-
-
-def render_intent_classification_form() -> None:
-    st.text_input("Product Attributes", key="intent_product_attributes")
-
-    generation_mode = st.radio(
-        "Conversation history generation approach",
-        ("Automatic", "Manual"),
-        horizontal=True,
-    )
-
-    if generation_mode == "Automatic":
-        with st.expander("Generate Prompt"):
-            with st.expander("Advanced"):
-                examples_to_retrieve = st.number_input("Examples to retrieve", value=5)
-                turns_to_generate = st.number_input("Turns to generate", value=3)
-
-            examples = _auto_examples("intentData_100.jsonl", "ChatHistory", int(examples_to_retrieve),
-                                      "ProductAttributes")
-            add_auto_turn_fragment(
-                st.session_state.intent_product_attributes,
-                "Assistant",
-                examples,
-                int(turns_to_generate),
-            )
-    else:
-        init_state()
-        add_manual_turn_fragment()
-
-    st.text_input("Customer Utterance", key="intent_customer_utterance")
-    st.selectbox("Intent Option", INTENT_OPTIONS, key="intent_options")
-    st.selectbox("Ambiguity Level", INTENT_AMBIGUITY_LEVELS, key="intent_ambiguity_level")
-
-    if st.button("Generate Intent Classification JSON", use_container_width=True):
-        synthetic_conv_key = "assistant_synthetic_conversation"
-        conversation_history = (
-                st.session_state.get(synthetic_conv_key)
-                or "\n".join(
-            f"Customer: {c['user_input']}\nAssistant: {c['assistant_output']}" for c in
-            st.session_state.get('chat_history', [])
-        )
-        )
-        benchmark = {
-            "ProductAttributes": f"<product_details>{st.session_state.intent_product_attributes}</product_details>",
-            "ChatHistory": f"<conversation_history>{conversation_history}</conversation_history>",
-            "CustomerUtterance": f"<latest_utterance>{st.session_state.intent_customer_utterance}</latest_utterance>",
-            "Intent": f"<intents>{st.session_state.intent_options}</intents>",
-            "Ambiguity": f"<ambiguity_levels>{st.session_state.intent_ambiguity_level}</ambiguity_levels>",
-            "Labelled?": None,
-            "Comments": None,
-        }
-
-        pretty_json = json.dumps(benchmark, indent=2, ensure_ascii=False)
-        with st.expander("JSON Output"):
-            st.code(pretty_json, language="json", wrap_lines=True)
-        st.download_button("📥 Download JSON", data=pretty_json, file_name="intent_classification.json",
-                           mime="application/json", use_container_width=True)
-
-
-def render_text_to_option() -> None:
-    st.subheader("Fixed Instructions")
-    with st.expander("Task Instructions"):
-        st.markdown(TEXT_TO_OPTION_TASK_INSTRUCTIONS)
-    with st.expander("K-Shot Examples"):
-        st.code(TEXT_TO_OPTION_K_SHOT_EXAMPLES, language="xml")
-    st.subheader("Per-Sample Section")
-    render_text_to_option_form()
-
-
-def render_text_to_option_form() -> None:
-    st.text_input("Product Type", key="txt2_product_type")
-
-    generation_mode = st.radio("Conversation history generation approach", ("Automatic", "Manual"), horizontal=True)
-
-    if generation_mode == "Automatic":
-        with st.expander("Generate Prompt"):
-            with st.expander("Advanced"):
-                examples_to_retrieve = st.number_input("Examples to retrieve", value=5)
-                turns_to_generate = st.number_input("Turns to generate", value=3)
-
-            examples = _auto_examples("Text2Options_100.jsonl", "ConversationHistory", int(examples_to_retrieve),
-                                      "ProductType")
-            add_auto_turn_fragment(st.session_state.txt2_product_type, "COMPASS", examples, int(turns_to_generate))
-    else:
-        init_state()
-        add_manual_turn_fragment()
-
-    st.text_input("Question", key="txt2_question")
-    st.text_area("Options", key="txt2_options")
-    st.text_input("Input", key="txt2_input")
-    st.selectbox("Output Class", TEXT_TO_OPTION_OUTPUT_CLASS, key="txt2_output_class")
-    st.number_input("Output Class Index", value=0, key="txt2_output_class_index")
-
-    if st.button("Generate Text2Options JSON", use_container_width=True):
-        synthetic_conv_key = "compass_synthetic_conversation"
-        conversation_history = (
-                st.session_state.get(synthetic_conv_key)
-                or "\n".join(
-            f"Customer: {c['user_input']}\nCOMPASS: {c['assistant_output']}" for c in
-            st.session_state.get('chat_history', [])
-        )
-        )
-
-        product_details = {
-            "ProductType": f"<attributes>{st.session_state.get('txt2_product_type', '')}</attributes>",
-            "ConversationHistory": f"<history>{conversation_history}</history>",
-            "Question": f"<last_chatbot_question>{st.session_state.get('txt2_question', '')}</last_chatbot_question>",
-            "Options": f"<question_classes>{st.session_state.get('txt2_options', '').strip().splitlines()}</question_classes>",
-            "Input": f"<cust_query>{st.session_state.get('txt2_input', '')}</cust_query>",
-            "OutputClass": st.session_state.get("txt2_output_class", ""),
-            "OutputClassIndex": st.session_state.get("txt2_output_class_index", -1)
-        }
-
-        pretty_json = json.dumps(product_details, indent=2, ensure_ascii=False)
-        with st.expander("JSON Output"):
-            st.code(pretty_json, language="json", wrap_lines=True)
-
-        st.download_button("📥 Download JSON", data=pretty_json, file_name="product_details.json",
-                           mime="application/json", use_container_width=True)
+    def ranked(limit: int) -> list[int]:
+        if strategy != "Similar":
+            return []
+        from .retrieval import top_k_examples
+
+        if stratify and label is not None:
+            hits = top_k_examples(corpus, query, _BUDGET_CANDIDATES)
+            return [idx for idx in hits if corpus.labels(idx)[stratify] == label][:limit]
+        return top_k_examples(corpus, query, limit)
+
+    def random_rows(count: int, exclude: set[int]) -> list[int]:
+        if stratify:
+            return corpus.stratified_sample(count, stratify, label, exclude=exclude)
+        return corpus.sample(count, exclude=exclude)
+
+    if token_budget:
+        candidates = chain(ranked(_BUDGET_CANDIDATES),
+                           random_rows(4 * _BUDGET_CANDIDATES, set()) if stratify
+                           else corpus.random_ids(4 * _BUDGET_CANDIDATES))
+        chosen = corpus.pack(candidates, token_budget, overhead=estimate_tokens(divider))
+        return divider.join(corpus.example(idx) for idx in chosen)
+
+    chosen = ranked(k)
+    if len(chosen) < k:
+        # Pad with random rows when the query is blank or matches fewer than *k* examples.
+        chosen += random_rows(k - len(chosen), set(chosen))
+    return divider.join(corpus.example(idx) for idx in chosen)
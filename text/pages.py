@@ -0,0 +1,50 @@
+"""Registry of benchmark pages, each living in its own ``text.benchmarks`` module.
+
+A page's module is imported the first time the page is selected and reused afterwards, so start-up
+and rerun cost do not grow with the number of benchmarks. First-import times are kept per process
+(see :func:`import_timings`); ``python -X importtime -m streamlit run app.py`` gives the full picture.
+"""
+from __future__ import annotations
+
+import importlib
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import lru_cache
+
+
+@dataclass(frozen=True)
+class Page:
+    title: str
+    module: str
+    render: str
+
+
+PAGES: dict[str, Page] = {page.title: page for page in (
+    Page("Intent Classification", "text.benchmarks.intent", "render_intent_classification_page"),
+    Page("TEN Classification", "text.benchmarks.ten", "render_ten_classification_page"),
+    Page("Text2Options", "text.benchmarks.text2options", "render_text_to_option"),
+    Page("BFCL", "text.benchmarks.bfcl", "render_bfcl_page"),
+)}
+
+_import_ms: dict[str, float] = {}
+_import_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def load_page(title: str) -> Callable[[], None]:
+    """Import the module behind page *title* (once per process) and return its render function."""
+    page = PAGES[title]
+    # Sessions rerun on separate threads; the lock keeps the measured time to a single import.
+    with _import_lock:
+        started = time.perf_counter()
+        module = importlib.import_module(page.module)
+        _import_ms.setdefault(page.module, (time.perf_counter() - started) * 1000)
+    return getattr(module, page.render)
+
+
+def import_timings() -> dict[str, float]:
+    """Milliseconds each page module took to import on first use in this process."""
+    with _import_lock:
+        return dict(_import_ms)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from .prompts import SYNTHETIC_DATA_PROMPT
+
+
+class RenderedPrompt(NamedTuple):
+    text: str
+    tokens: int
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap, tokenizer-free token estimate: the mean of the ~4 chars/token and ~0.75 words/token rules."""
+    words = text.count(" ") + text.count("\n") + 1 if text else 0
+    return round((len(text) / 4 + words * 4 / 3) / 2)
+
+
+class PromptCache:
+    """Thread-safe LRU of rendered prompts keyed by a digest of their inputs."""
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, RenderedPrompt] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(*parts: object) -> bytes:
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            encoded = str(part).encode()
+            # Length-prefix each part so ("ab", "c") and ("a", "bc") never collide.
+            digest.update(len(encoded).to_bytes(8, "little"))
+            digest.update(encoded)
+        return digest.digest()
+
+    def get(self, key: bytes) -> RenderedPrompt | None:
+        with self._lock:
+            prompt = self._entries.get(key)
+            if prompt is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return prompt
+
+    def put(self, key: bytes, prompt: RenderedPrompt) -> None:
+        with self._lock:
+            self._entries[key] = prompt
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+_PROMPTS = PromptCache()
+
+
+def build_synthetic_prompt(n: int, assistant_name: str, title: str, examples: str) -> RenderedPrompt:
+    """Render :data:`SYNTHETIC_DATA_PROMPT` (memoised) together with its estimated token count."""
+    key = PromptCache.key(n, assistant_name, title, examples)
+    prompt = _PROMPTS.get(key)
+    if prompt is None:
+        text = SYNTHETIC_DATA_PROMPT.format(n=n, assistant_name=assistant_name, title=title, examples=examples).strip()
+        prompt = RenderedPrompt(text, estimate_tokens(text))
+        _PROMPTS.put(key, prompt)
+    return prompt
@@ -33,6 +33,18 @@ INTENT_OPTIONS = [
 
 INTENT_AMBIGUITY_LEVELS = ["LOW", "HIGH", "NA"]
 
+# Intents whose ambiguity level must be "NA" (see INTENT_INSTRUCTIONS_REMINDER).
+INTENT_NA_AMBIGUITY_INTENTS = [
+    "RETURN_REFUND_REPLACEMENT_ISSUES",
+    "DELIVERY_ISSUES",
+    "PHYSICAL_DAMAGE_ISSUES",
+    "IN_DOMAIN_OUT_OF_SCOPE",
+    "IN_DOMAIN_HARMFUL",
+    "NON_ECOMMERCE",
+    "CONNECT_TO_AGENT",
+    "END_CONVERSATION",
+]
+
 INTENT_GENERAL_INSTRUCTIONS = """
 Human: You are a Troubleshooting Assistant—an AI assistant developed by Amazon. You help customers resolve their product issues on Amazon.
 
@@ -707,3 +719,15 @@ TEXT_TO_OPTION_K_SHOT_EXAMPLES = """
   <query_class_index>3</query_class_index>
 </example>
 """
+
+BFCL_INSTRUCTIONS = """
+Author one **function-calling** sample for the Berkeley Function Calling Leaderboard (BFCL) format.
+
+1. **Pick the functions** the model is offered. Search the catalog by name or description and add
+   every function that belongs in the sample, including plausible distractors.
+2. **Write the user question**. It should be answerable with the chosen functions alone.
+3. **Write the ground-truth calls**, one per line, using keyword arguments only, for example
+   `order.track_package(order_id="113-4457", include_history=True)`.
+   Every call must name a chosen function and satisfy its parameter schema (required arguments,
+   types, enums and ranges). The checks run as you type.
+"""
@@ -0,0 +1,236 @@
+"""Shared SQLite (WAL) store for generated records, written by every annotation session on a server.
+
+Usage::
+
+    python -m text.record_store export intent -o intent.jsonl
+    python -m text.record_store counts
+"""
+from __future__ import annotations
+
+import argparse
+import atexit
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from .sink import DATASET_DIR
+from .stats import LabelStats
+
+_log = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id      TEXT PRIMARY KEY,
+    task    TEXT NOT NULL,
+    created REAL NOT NULL,
+    body    TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS records_task ON records (task, id);
+CREATE TABLE IF NOT EXISTS counts (
+    task TEXT PRIMARY KEY,
+    n    INTEGER NOT NULL
+);
+"""
+
+
+def new_record_id() -> str:
+    """Time-ordered, collision-free id: 64-bit nanosecond timestamp plus 64 random bits, as hex."""
+    return f"{time.time_ns():016x}{secrets.token_hex(8)}"
+
+
+class RecordStore:
+    """Write-behind record store shared by all sessions (and processes) through one SQLite file.
+
+    Each process holds one connection. Appends are buffered and written in a single
+    ``BEGIN IMMEDIATE`` transaction per batch, once *batch_size* records are pending or after
+    *flush_interval* seconds. WAL mode keeps readers from blocking the writer, and the busy
+    timeout serialises writers from other processes instead of failing them. Per-task counts are
+    kept in their own table, updated in the same transaction, so counting never scans.
+    """
+
+    def __init__(self, path: Path, *, batch_size: int = 100, flush_interval: float = 0.5) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._buffer: list[tuple[str, str, float, str]] = []
+        self._pending: Counter[str] = Counter()
+        self._stats: dict[str, LabelStats] = {}
+        self._closed = threading.Event()
+        self._timer = threading.Thread(target=self._flush_periodically, name=f"store-{path.name}", daemon=True)
+        self._timer.start()
+
+    def append(self, task: str, record: dict[str, Any], record_id: str | None = None) -> str:
+        """Buffer *record* under *task* and return its id (*record_id* when the caller allocated one)."""
+        record_id = record_id or new_record_id()
+        body = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._buffer.append((record_id, task, time.time(), body))
+            self._pending[task] += 1
+            if task in self._stats:
+                self._stats[task].update(record)
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+        return record_id
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        db = self._db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.executemany("INSERT INTO records VALUES (?, ?, ?, ?)", self._buffer)
+            db.executemany("INSERT INTO counts VALUES (?, ?) ON CONFLICT (task) DO UPDATE SET n = n + excluded.n",
+                           self._pending.items())
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        self._buffer.clear()
+        self._pending.clear()
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error:
+                # Same policy as the JSONL sinks: the batch stays buffered and the next tick retries it.
+                _log.exception("Flushing %s failed; retrying in %.1fs", self.path, self.flush_interval)
+
+    def count(self, task: str) -> int:
+        """Records stored for *task* by every process, plus this process' pending ones."""
+        with self._lock:
+            row = self._db.execute("SELECT n FROM counts WHERE task = ?", (task,)).fetchone()
+            return (row[0] if row else 0) + self._pending[task]
+
+    def pending(self, task: str) -> int:
+        with self._lock:
+            return self._pending[task]
+
+    def stats(self, task: str) -> LabelStats:
+        """Label aggregates for *task*, built from the table on first use and kept current by :meth:`append`."""
+        with self._lock:
+            if task not in self._stats:
+                self._flush_locked()
+                stats = LabelStats(task)
+                for (body,) in self._db.execute("SELECT body FROM records WHERE task = ? ORDER BY id", (task,)):
+                    stats.update(json.loads(body))
+                self._stats[task] = stats
+            return LabelStats.from_json(self._stats[task].to_json())
+
+    def counts(self) -> dict[str, int]:
+        """Stored records per task (all processes, flushed records only)."""
+        with self._lock:
+            return dict(self._db.execute("SELECT task, n FROM counts ORDER BY task").fetchall())
+
+    def bodies(self, task: str) -> Iterator[tuple[str, str]]:
+        """Stream ``(id, JSON body)`` of *task*'s records, oldest first, including this process' pending ones."""
+        self.flush()
+        # A separate read connection sees one WAL snapshot and does not hold up writers.
+        reader = sqlite3.connect(self.path)
+        try:
+            yield from reader.execute("SELECT id, body FROM records WHERE task = ? ORDER BY id", (task,))
+        finally:
+            reader.close()
+
+    def export_jsonl(self, task: str, target: Path) -> int:
+        """Write *task*'s records, oldest first, in the same JSONL schema as the file sinks; returns the count."""
+        rows = 0
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        with tmp.open("w", encoding="utf-8") as out:
+            for _, body in self.bodies(task):
+                out.write(body + "\n")
+                rows += 1
+        os.replace(tmp, target)
+        return rows
+
+    def close(self) -> None:
+        self._closed.set()
+        self.flush()
+
+
+class TaskView:
+    """One task's slice of a :class:`RecordStore`, with the same surface as a :class:`~text.sink.DatasetSink`."""
+
+    def __init__(self, store: RecordStore, task: str) -> None:
+        self.store = store
+        self.task = task
+        self.path = store.path
+
+    def append(self, record: dict[str, Any], record_id: str | None = None) -> int:
+        self.store.append(self.task, record, record_id)
+        return self.count
+
+    def record_key(self, record_id: str) -> str:
+        """Name of record *record_id* in near-duplicate reports, unique across tasks."""
+        return f"{self.path.name}:{self.task}:{record_id}"
+
+    @property
+    def count(self) -> int:
+        return self.store.count(self.task)
+
+    @property
+    def pending(self) -> int:
+        return self.store.pending(self.task)
+
+    @property
+    def stats(self) -> LabelStats:
+        return self.store.stats(self.task)
+
+
+RECORD_STORE = "records.sqlite3"
+
+
+@lru_cache(maxsize=None)
+def get_record_store() -> RecordStore:
+    """Process-wide store next to the JSONL datasets, flushed on interpreter exit."""
+    store = RecordStore(DATASET_DIR / RECORD_STORE)
+    atexit.register(store.close)
+    return store
+
+
+@lru_cache(maxsize=None)
+def get_task_view(task: str) -> TaskView:
+    return TaskView(get_record_store(), task)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="write one task's records as JSONL")
+    export.add_argument("task")
+    export.add_argument("-o", "--output", type=Path, required=True)
+    commands.add_parser("counts", help="records per task")
+    args = parser.parse_args(argv)
+
+    store = get_record_store()
+    if args.command == "export":
+        rows = store.export_jsonl(args.task, args.output)
+        print(f"{rows} {args.task} records -> {args.output}", file=sys.stderr)
+    else:
+        for task, n in store.counts().items():
+            print(f"{task}: {n}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
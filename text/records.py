@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import ast
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from .conversation import Conversation
+
+INTENT_TASK = "intent"
+TEN_TASK = "ten"
+TEXT2OPTIONS_TASK = "text2options"
+BFCL_TASK = "bfcl"
+
+
+def format_conversation(pairs: Iterable[tuple[str, str]], assistant_name: str) -> str:
+    """Join manual ``(user_input, assistant_output)`` turns into the flat history string."""
+    return Conversation.from_pairs(pairs, assistant_name).format()
+
+
+def build_intent_record(product_attributes: str, conversation_history: str, customer_utterance: str,
+                        intent: str, ambiguity: str) -> dict[str, Any]:
+    """Tag the intent-classification fields the way the benchmark expects them."""
+    return {
+        "ProductAttributes": f"<product_details>{product_attributes}</product_details>",
+        "ChatHistory": f"<conversation_history>{conversation_history}</conversation_history>",
+        "CustomerUtterance": f"<latest_utterance>{customer_utterance}</latest_utterance>",
+        "Intent": f"<intents>{intent}</intents>",
+        "Ambiguity": f"<ambiguity_levels>{ambiguity}</ambiguity_levels>",
+        "Labelled?": None,
+        "Comments": None,
+    }
+
+
+def build_text2options_record(product_type: str, conversation_history: str, question: str, options: str | list[str],
+                              customer_input: str, output_class: str, output_class_index: int | str) -> dict[str, Any]:
+    """Tag the Text2Options fields; *options* may be the raw one-per-line text or a list."""
+    if isinstance(options, str):
+        options = options.strip().splitlines()
+    return {
+        "ProductType": f"<attributes>{product_type}</attributes>",
+        "ConversationHistory": f"<history>{conversation_history}</history>",
+        "Question": f"<last_chatbot_question>{question}</last_chatbot_question>",
+        "Options": f"<question_classes>{options}</question_classes>",
+        "Input": f"<cust_query>{customer_input}</cust_query>",
+        "OutputClass": output_class,
+        "OutputClassIndex": output_class_index,
+    }
+
+
+def build_bfcl_record(question: str, functions: list[dict[str, Any]],
+                      calls: Iterable[tuple[str, dict[str, Any]]]) -> dict[str, Any]:
+    """BFCL sample: the user turn, the offered function definitions and the ground-truth calls.
+
+    Ground truth follows BFCL's ``{name: {argument: [accepted values]}}`` shape.
+    """
+    return {
+        "question": [[{"role": "user", "content": question}]],
+        "function": functions,
+        "ground_truth": [{name: {key: [value] for key, value in arguments.items()}} for name, arguments in calls],
+    }
+
+
+def intent_record_from_row(row: Mapping[str, Any]) -> dict[str, Any]:
+    """Build an intent record from a flat input row keyed like the dataset columns."""
+    return build_intent_record(
+        row.get("ProductAttributes") or "",
+        row.get("ChatHistory") or "",
+        row.get("CustomerUtterance") or "",
+        row.get("Intent") or "",
+        row.get("Ambiguity") or "",
+    )
+
+
+def _parse_options(options: Any) -> str | list[str]:
+    # Exported rows store the list as its Python repr, e.g. "['Option A', 'None']".
+    if isinstance(options, str) and options.lstrip().startswith("["):
+        try:
+            parsed = ast.literal_eval(options.strip())
+        except (ValueError, SyntaxError):
+            return options
+        if isinstance(parsed, list):
+            return [str(option) for option in parsed]
+    return options or ""
+
+
+def _parse_index(index: Any) -> int | str:
+    if index in (None, ""):
+        return -1
+    try:
+        return int(index)
+    except (TypeError, ValueError):
+        # Multi-class answers such as "1, 3" are kept verbatim.
+        return str(index).strip()
+
+
+def text2options_record_from_row(row: Mapping[str, Any]) -> dict[str, Any]:
+    """Build a Text2Options record from a flat input row keyed like the dataset columns."""
+    return build_text2options_record(
+        row.get("ProductType") or "",
+        row.get("ConversationHistory") or "",
+        row.get("Question") or "",
+        _parse_options(row.get("Options")),
+        row.get("Input") or "",
+        row.get("OutputClass") or "",
+        _parse_index(row.get("OutputClassIndex")),
+    )
+
+
+RECORD_BUILDERS = {
+    INTENT_TASK: intent_record_from_row,
+    TEXT2OPTIONS_TASK: text2options_record_from_row,
+}
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import re
+import zlib
+from array import array
+from collections import Counter
+from collections.abc import Iterable
+from functools import lru_cache
+
+import numpy as np
+
+from .corpus import ExampleCorpus
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    """Hashed-feature BM25 index stored as CSR postings (term → docs, weights)."""
+
+    def __init__(self, documents: Iterable[tuple[str, str]], *, n_features: int = 1 << 20, k1: float = 1.2,
+                 b: float = 0.75, title_boost: int = 2, max_df: float = 0.5) -> None:
+        self._mask = n_features - 1
+        if n_features & self._mask:
+            raise ValueError("n_features must be a power of two")
+
+        terms, docs, tfs = array("I"), array("I"), array("f")
+        lengths = array("f")
+        for doc_id, (title, body) in enumerate(documents):
+            counts = Counter(self._features(body))
+            for _ in range(title_boost):
+                counts.update(self._features(title))
+            lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                terms.append(term)
+                docs.append(doc_id)
+                tfs.append(tf)
+        self.n_docs = len(lengths)
+
+        terms_np = np.frombuffer(terms, dtype=np.uint32)
+        docs_np = np.frombuffer(docs, dtype=np.uint32)
+        tfs_np = np.frombuffer(tfs, dtype=np.float32)
+        lengths_np = np.frombuffer(lengths, dtype=np.float32)
+
+        df = np.bincount(terms_np, minlength=n_features)
+        # Terms present in most rows ("customer", "assistant", ...) carry no signal but dominate postings.
+        keep = df[terms_np] <= max(1.0, max_df * self.n_docs)
+        terms_np, docs_np, tfs_np = terms_np[keep], docs_np[keep], tfs_np[keep]
+
+        order = np.argsort(terms_np, kind="stable")
+        terms_np, docs_np, tfs_np = terms_np[order], docs_np[order], tfs_np[order]
+
+        idf = np.log1p((self.n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avgdl = float(lengths_np.mean()) if self.n_docs else 1.0
+        norm = k1 * (1.0 - b + b * lengths_np[docs_np] / max(avgdl, 1.0))
+
+        self._indptr = np.zeros(n_features + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms_np, minlength=n_features), out=self._indptr[1:])
+        self._docs = docs_np
+        self._weights = (idf[terms_np] * tfs_np * (k1 + 1.0) / (tfs_np + norm)).astype(np.float32)
+
+    def _features(self, text: str) -> list[int]:
+        return [zlib.crc32(token.encode()) & self._mask for token in _tokenize(text)]
+
+    def top_k(self, query: str, k: int) -> list[int]:
+        """Return up to *k* document ids ranked by BM25 score against *query* (only positive scores)."""
+        if not self.n_docs or k <= 0:
+            return []
+
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for term in set(self._features(query)):
+            start, stop = self._indptr[term], self._indptr[term + 1]
+            # Each document occurs at most once per term, so plain fancy-index add is safe.
+            scores[self._docs[start:stop]] += self._weights[start:stop]
+
+        k = min(k, self.n_docs)
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [int(idx) for idx in ranked if scores[idx] > 0.0]
+
+
+@lru_cache(maxsize=16)
+def get_index(corpus: ExampleCorpus) -> BM25Index:
+    """Build (once per corpus version) the BM25 index over titles and histories in a single streaming pass."""
+    return BM25Index(corpus.rows())
+
+
+def top_k_examples(corpus: ExampleCorpus, query: str, k: int) -> list[int]:
+    """Rank *corpus* rows by similarity to *query*; fall back to an empty list for blank queries."""
+    if not query.strip() or not len(corpus):
+        return []
+    return get_index(corpus).top_k(query, k)
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Soft cap on what one annotator's session may hold; derived values are evicted first, then we warn.
+SESSION_BYTE_BUDGET = int(os.environ.get("SESSION_BYTE_BUDGET", 4 << 20))
+_WARN_RATIO = 0.8
+_DERIVED_KEY = "_derived"
+# Sessions that have not rerun for this long drop out of the process-wide report.
+_SESSION_IDLE_SECONDS = 3600
+
+
+class TurnLog:
+    """Manual chat turns as ``(user_input, assistant_output)`` tuples keyed by a stable, never reused id.
+
+    A tuple of two strings costs about a third of the equivalent two-key dict, and :attr:`nbytes`
+    is maintained on every change so the session report never walks the turns.
+    """
+
+    __slots__ = ("_turns", "_next_id", "nbytes")
+
+    def __init__(self) -> None:
+        self._turns: dict[int, tuple[str, str]] = {}
+        self._next_id = 0
+        self.nbytes = sys.getsizeof(self._turns)
+
+    @staticmethod
+    def _size(turn: tuple[str, str]) -> int:
+        return sys.getsizeof(turn) + sys.getsizeof(turn[0]) + sys.getsizeof(turn[1])
+
+    def add(self, user_input: str, assistant_output: str) -> int:
+        turn_id, self._next_id = self._next_id, self._next_id + 1
+        turn = self._turns[turn_id] = (user_input, assistant_output)
+        self.nbytes += self._size(turn)
+        return turn_id
+
+    def remove(self, turn_id: int) -> bool:
+        turn = self._turns.pop(turn_id, None)
+        if turn is None:
+            return False
+        self.nbytes -= self._size(turn)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+    def items(self) -> Iterator[tuple[int, tuple[str, str]]]:
+        return iter(self._turns.items())
+
+    def pairs(self) -> Iterator[tuple[str, str]]:
+        return iter(self._turns.values())
+
+
+def sizeof(value: Any, _seen: set[int] | None = None) -> int:
+    """Approximate deep size of a session value (strings, containers, :class:`TurnLog`)."""
+    if isinstance(value, TurnLog):
+        return value.nbytes
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, Mapping):
+        size += sum(sizeof(k, seen) + sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset, deque)):
+        size += sum(sizeof(item, seen) for item in value)
+    return size
+
+
+def _derived() -> OrderedDict[str, Any]:
+    return st.session_state.setdefault(_DERIVED_KEY, OrderedDict())
+
+
+def remember_derived(key: str, value: Any) -> None:
+    """Keep a value that can be recomputed (e.g. rendered JSON); these are evicted first when over budget."""
+    derived = _derived()
+    derived.pop(key, None)
+    derived[key] = value
+
+
+def recall_derived(key: str) -> Any:
+    return _derived().get(key)
+
+
+def forget_derived(key: str) -> None:
+    _derived().pop(key, None)
+
+
+def session_report() -> dict[str, int]:
+    """Approximate bytes held per session-state key, largest first."""
+    sizes = {str(key): sizeof(value) for key, value in st.session_state.items()}
+    return dict(sorted(sizes.items(), key=lambda item: item[1], reverse=True))
+
+
+_sessions: dict[str, tuple[int, float]] = {}
+_sessions_lock = threading.Lock()
+
+
+def enforce_budget(budget: int = SESSION_BYTE_BUDGET) -> int:
+    """Evict derived values, oldest first, until the session fits *budget*; returns the bytes still held.
+
+    Also records the total for the process-wide report in :func:`render_memory_sidebar`.
+    """
+    total = sum(session_report().values())
+    derived = _derived()
+    while total > budget and derived:
+        _, value = derived.popitem(last=False)
+        total -= sizeof(value)
+    if ctx := get_script_run_ctx():
+        now = time.monotonic()
+        with _sessions_lock:
+            _sessions[ctx.session_id] = (total, now)
+            for session_id, (_, seen) in list(_sessions.items()):
+                if now - seen > _SESSION_IDLE_SECONDS:
+                    del _sessions[session_id]
+    return total
+
+
+def render_memory_sidebar(budget: int = SESSION_BYTE_BUDGET) -> None:
+    """Sidebar report of this session's state size against the budget, plus the server-wide total."""
+    total = enforce_budget(budget)
+    if total > budget:
+        st.sidebar.warning(f"Session state holds {total / 1e6:.1f} MB, over the {budget / 1e6:.1f} MB budget; "
+                           "remove turns or clear pasted conversations.", icon="⚠️")
+    elif total > _WARN_RATIO * budget:
+        st.sidebar.warning(f"Session state is at {total / budget:.0%} of its {budget / 1e6:.1f} MB budget.",
+                           icon="⚠️")
+    with st.sidebar.expander("Session memory"):
+        st.progress(min(total / budget, 1.0), text=f"{total / 1e3:,.0f} kB of {budget / 1e3:,.0f} kB")
+        for key, size in list(session_report().items())[:8]:
+            st.caption(f"`{key}`: {size / 1e3:,.1f} kB")
+        with _sessions_lock:
+            sessions = [size for size, _ in _sessions.values()]
+        st.caption(f"Server: {len(sessions)} active sessions · {sum(sessions) / 1e6:.1f} MB session state")
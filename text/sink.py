@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from .stats import STATS_SUFFIX, LabelStats
+
+DATASET_DIR = Path("output")
+
+_log = logging.getLogger(__name__)
+
+
+def _count_lines(path: Path) -> int:
+    if not path.exists():
+        return 0
+    count = 0
+    with path.open("rb") as fp:
+        while block := fp.read(1 << 20):
+            count += block.count(b"\n")
+    return count
+
+
+class DatasetSink:
+    """Append-only JSONL writer with write-behind buffering.
+
+    Records are buffered in memory and written (then ``fsync``-ed) in one batch once *batch_size*
+    records are pending or *flush_interval* seconds have passed, whichever comes first.
+    Label aggregates (:attr:`stats`) are updated on every append and persisted to the
+    ``<name>.stats.json`` sidecar with each flush.
+    """
+
+    def __init__(self, path: Path, task: str, *, batch_size: int = 100, flush_interval: float = 2.0) -> None:
+        self.path = path
+        self.task = task
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._buffer: list[str] = []
+        self._written = _count_lines(path)
+        self.stats_path = path.with_name(path.stem + STATS_SUFFIX)
+        self._stats = LabelStats.load(self.stats_path, path, self._written, task)
+        self._closed = threading.Event()
+        self._timer = threading.Thread(target=self._flush_periodically, name=f"sink-{path.name}", daemon=True)
+        self._timer.start()
+
+    @property
+    def count(self) -> int:
+        """Records accepted so far, including those still buffered."""
+        with self._lock:
+            return self._written + len(self._buffer)
+
+    @property
+    def stats(self) -> LabelStats:
+        """A consistent copy of the running label aggregates."""
+        with self._lock:
+            return LabelStats.from_json(self._stats.to_json())
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def append(self, record: dict[str, Any]) -> int:
+        """Buffer *record* and return the running record count."""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._buffer.append(line)
+            self._stats.update(record)
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+            return self._written + len(self._buffer)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        start = None
+        try:
+            with self.path.open("ab") as fp:
+                start = fp.tell()
+                fp.write("".join(self._buffer).encode())
+                fp.flush()
+                os.fsync(fp.fileno())
+        except BaseException:
+            # The batch stays buffered for a retry, so drop whatever part of it reached the file.
+            if start is not None:
+                os.truncate(self.path, start)
+            raise
+        self._written += len(self._buffer)
+        self._buffer.clear()
+        self._stats.save(self.stats_path)
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError:
+                # Keep the thread alive: unwritten records stay buffered and the next tick retries them.
+                _log.exception("Flushing %s failed; retrying in %.1fs", self.path, self.flush_interval)
+
+    def close(self) -> None:
+        self._closed.set()
+        self.flush()
+
+
+@lru_cache(maxsize=None)
+def get_sink(task: str) -> DatasetSink:
+    """Process-wide sink for *task*, shared by every session and flushed on interpreter exit."""
+    sink = DatasetSink(DATASET_DIR / f"{task}.jsonl", task)
+    atexit.register(sink.close)
+    return sink
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+import os
+from collections import Counter
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .columnar import CATEGORICAL_VOCABULARIES as LABEL_VOCABULARIES
+from .conversation import parse_conversation
+from .validation import untag
+
+STATS_SUFFIX = ".stats.json"
+CROSSTABS = (("Intent", "Ambiguity"),)
+# History field of each record kind, with the assistant name its turns are labelled with.
+HISTORY_FIELDS = {"ChatHistory": "Assistant", "ConversationHistory": "COMPASS"}
+
+
+def bucket_order(item: tuple[str, int]) -> int:
+    """Sort key for ``(bucket, count)`` pairs, smallest bucket first."""
+    return int(item[0].split("-")[0])
+
+
+def _bucket(value: int) -> str:
+    """Power-of-two histogram bucket label, e.g. ``"8-15"``."""
+    if value <= 0:
+        return "0"
+    low = 1 << (value.bit_length() - 1)
+    return f"{low}-{2 * low - 1}"
+
+
+@dataclass
+class LabelStats:
+    """Running label aggregates for one *task*'s dataset, updated from each appended record without rescanning.
+
+    The turn count comes from the memoised :func:`~text.conversation.parse_conversation`, which the
+    form already filled when it showed the conversation, so saving does not tokenise it again.
+    """
+
+    task: str = ""
+    rows: int = 0
+    labels: dict[str, Counter[str]] = field(default_factory=dict)
+    crosstabs: dict[str, Counter[str]] = field(default_factory=dict)
+    turns: Counter[str] = field(default_factory=Counter)
+    characters: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def vocabularies(self) -> Mapping[str, list[str]]:
+        """Label fields counted for :attr:`task`, with their vocabularies."""
+        return LABEL_VOCABULARIES.get(self.task, {})
+
+    def update(self, record: Mapping[str, Any]) -> None:
+        self.rows += 1
+        values = {name: untag(record[name]) for name in self.vocabularies if name in record}
+        for name, value in values.items():
+            self.labels.setdefault(name, Counter())[str(value or "")] += 1
+        for left, right in CROSSTABS:
+            if left in values and right in values:
+                self.crosstabs.setdefault(f"{left}×{right}", Counter())[f"{values[left]}|{values[right]}"] += 1
+        for name, assistant_name in HISTORY_FIELDS.items():
+            if history := untag(record.get(name)):
+                self.turns[_bucket(len(parse_conversation(history, assistant_name)))] += 1
+                self.characters[_bucket(len(history))] += 1
+                break
+
+    def underfilled(self, name: str, ratio: float = 0.5) -> list[str]:
+        """Labels of *name* holding fewer than *ratio* × the mean count per vocabulary label."""
+        balance = self.balance(name)
+        floor = ratio * sum(count for _, count in balance) / max(len(balance), 1)
+        return [label for label, count in balance if count < floor]
+
+    def balance(self, name: str) -> list[tuple[str, int]]:
+        """Every vocabulary label of *name* with its count (zeros included), least filled first."""
+        counts = self.labels.get(name, Counter())
+        vocabulary = self.vocabularies.get(name, [])
+        labels = list(vocabulary) + [label for label in counts if label not in vocabulary]
+        return sorted(((label, counts[label]) for label in labels), key=lambda item: item[1])
+
+    def to_json(self) -> dict[str, Any]:
+        return {"task": self.task, "rows": self.rows, "labels": self.labels, "crosstabs": self.crosstabs,
+                "turns": self.turns, "characters": self.characters}
+
+    @classmethod
+    def from_json(cls, data: Mapping[str, Any]) -> LabelStats:
+        return cls(
+            task=data.get("task", ""),
+            rows=data["rows"],
+            labels={name: Counter(counts) for name, counts in data["labels"].items()},
+            crosstabs={name: Counter(counts) for name, counts in data["crosstabs"].items()},
+            turns=Counter(data["turns"]),
+            characters=Counter(data["characters"]),
+        )
+
+    def save(self, path: Path) -> None:
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self.to_json(), ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path, dataset: Path, rows: int, task: str) -> LabelStats:
+        """Load the persisted *task* aggregates, rescanning *dataset* once if they are missing or out of step."""
+        try:
+            stats = cls.from_json(json.loads(path.read_text(encoding="utf-8")))
+            if stats.rows == rows and stats.task == task:
+                return stats
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            pass
+
+        stats = cls(task)
+        if dataset.exists():
+            with dataset.open("rb") as fp:
+                for line in fp:
+                    if line.strip():
+                        stats.update(json.loads(line))
+        return stats
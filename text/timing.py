@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import json
+import statistics
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, NamedTuple, ParamSpec, TypeVar
+
+import streamlit as st
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+_TIMINGS_KEY = "_rerun_timings"
+_HISTORY = 20
+_TRACES_KEY = "_span_traces"
+_TRACE_HISTORY = 50
+
+
+class Span(NamedTuple):
+    name: str
+    start_ns: int
+    duration_ns: int
+    thread: int
+
+
+# Spans of the current rerun, or ``None`` while tracing is off so every span is a single lookup.
+_TRACE: ContextVar[list[Span] | None] = ContextVar("_trace", default=None)
+
+
+def _new_trace() -> list[Span]:
+    trace: list[Span] = []
+    st.session_state.setdefault(_TRACES_KEY, deque(maxlen=_TRACE_HISTORY)).append(trace)
+    return trace
+
+
+def start_trace(enabled: bool) -> None:
+    """Begin collecting spans for this rerun (kept for the last few reruns of the session) or switch them off."""
+    _TRACE.set(_new_trace() if enabled else None)
+
+
+def end_trace() -> None:
+    """Close the full rerun's trace, so a later fragment-only rerun starts its own (see :func:`timed`)."""
+    _TRACE.set(None)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the enclosed block as *name* when tracing is on for this rerun."""
+    trace = _TRACE.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        trace.append(Span(name, started, time.perf_counter_ns() - started, threading.get_ident()))
+
+
+def traced(name: str | None = None) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """Decorator form of :func:`span`; the span defaults to the function's name."""
+
+    def decorator(func: Callable[P, R]) -> Callable[P, R]:
+        label = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            trace = _TRACE.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            started = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                trace.append(Span(label, started, time.perf_counter_ns() - started, threading.get_ident()))
+
+        return wrapper
+
+    return decorator
+
+
+def record_rerun(scope: str, elapsed_ms: float) -> None:
+    """Remember the latest *elapsed_ms* for *scope* (``"full page"`` or a fragment name) in this session."""
+    timings = st.session_state.setdefault(_TIMINGS_KEY, {})
+    timings.setdefault(scope, deque(maxlen=_HISTORY)).append(elapsed_ms)
+
+
+def timed(scope: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """Decorator recording how long each run of the wrapped (fragment) function takes.
+
+    A fragment-only rerun skips ``app.py`` and with it :func:`start_trace`; when spans are switched
+    on, such a run collects its spans into a trace of its own.
+    """
+
+    def decorator(func: Callable[P, R]) -> Callable[P, R]:
+        @wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            started = time.perf_counter()
+            token = None
+            if _TRACE.get() is None and st.session_state.get("debug_spans", False):
+                token = _TRACE.set(_new_trace())
+            try:
+                with span(scope):
+                    return func(*args, **kwargs)
+            finally:
+                record_rerun(scope, (time.perf_counter() - started) * 1000)
+                if token is not None:
+                    _TRACE.reset(token)
+
+        return wrapper
+
+    return decorator
+
+
+def render_latency_sidebar(imports: Mapping[str, float] | None = None) -> None:
+    """Sidebar summary of the last and median rerun time per scope, plus one-off page *imports* (ms)."""
+    timings = st.session_state.get(_TIMINGS_KEY, {})
+    with st.sidebar.expander("Rerun latency"):
+        for scope, samples in timings.items():
+            st.caption(f"**{scope}**: last {samples[-1]:.1f} ms · median {statistics.median(samples):.1f} ms "
+                       f"({len(samples)} runs)")
+        for module, elapsed_ms in (imports or {}).items():
+            st.caption(f"import `{module}`: {elapsed_ms:.1f} ms (first use in this process)")
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+
+
+def span_summary(traces: Iterable[list[Span]]) -> dict[str, dict[str, float]]:
+    """p50/p95 (ms) per span name over *traces*, where a name's time is summed within each rerun."""
+    per_name: dict[str, list[float]] = {}
+    for trace in traces:
+        totals: dict[str, float] = {}
+        for item in trace:
+            totals[item.name] = totals.get(item.name, 0.0) + item.duration_ns / 1e6
+        for name, total in totals.items():
+            per_name.setdefault(name, []).append(total)
+    summary = {}
+    for name, samples in per_name.items():
+        samples.sort()
+        summary[name] = {"p50": _percentile(samples, 0.5), "p95": _percentile(samples, 0.95), "reruns": len(samples)}
+    return dict(sorted(summary.items(), key=lambda item: item[1]["p95"], reverse=True))
+
+
+def chrome_trace(traces: Iterable[list[Span]]) -> dict[str, Any]:
+    """Spans as Chrome trace-event JSON (load in ``chrome://tracing`` or Perfetto); one ``pid`` per rerun."""
+    events = [
+        {"name": item.name, "ph": "X", "ts": item.start_ns / 1e3, "dur": item.duration_ns / 1e3, "pid": rerun,
+         "tid": item.thread}
+        for rerun, trace in enumerate(traces) for item in trace
+    ]
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def render_trace_sidebar() -> None:
+    """Optional debug panel: switch span collection on and show p50/p95 per span with JSON/Chrome-trace export."""
+    with st.sidebar.expander("Debug: hot-path spans"):
+        if not st.toggle("Collect timing spans", key="debug_spans",
+                         help="Takes effect from the next rerun; spans cost a single lookup while this is off"):
+            return
+        traces = list(st.session_state.get(_TRACES_KEY, ()))
+        summary = span_summary(traces)
+        if not summary:
+            st.caption("No spans yet; interact with the page to collect some.")
+            return
+        st.dataframe(
+            {"span": list(summary), "p50 ms": [row["p50"] for row in summary.values()],
+             "p95 ms": [row["p95"] for row in summary.values()], "reruns": [row["reruns"] for row in summary.values()]},
+            hide_index=True, use_container_width=True,
+        )
+        raw = [[item._asdict() for item in trace] for trace in traces]
+        st.download_button("Export JSON", json.dumps(raw), file_name="spans.json", mime="application/json",
+                           use_container_width=True)
+        st.download_button("Export Chrome trace", json.dumps(chrome_trace(traces)), file_name="trace.json",
+                           mime="application/json", use_container_width=True)
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import ast
+import json
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Any
+
+from .prompts import (INTENT_AMBIGUITY_LEVELS, INTENT_NA_AMBIGUITY_INTENTS, INTENT_OPTIONS,
+                      TEXT_TO_OPTION_OUTPUT_CLASS)
+from .records import INTENT_TASK, TEXT2OPTIONS_TASK
+
+Columns = Mapping[str, Sequence[Any]]
+
+
+ERROR, WARNING = "error", "warning"
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A named check over whole columns, returning the indices of the violating rows.
+
+    Only ``error`` rules, which come from the label vocabularies in :mod:`text.prompts`, fail a
+    record; ``warning`` rules flag structural gaps that legitimate records may have.
+    """
+
+    name: str
+    message: str
+    check: Callable[[Columns], Iterable[int]]
+    severity: str = ERROR
+
+
+@dataclass
+class ValidationReport:
+    rows: int = 0
+    violations: Counter[str] = field(default_factory=Counter)
+    warnings: Counter[str] = field(default_factory=Counter)
+    # First few offending row numbers per rule, for pointing annotators at the problem.
+    samples: dict[str, list[int]] = field(default_factory=dict)
+    messages: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations
+
+    def merge(self, other: ValidationReport, row_offset: int = 0, max_samples: int = 5) -> None:
+        self.rows += other.rows
+        self.violations.update(other.violations)
+        self.warnings.update(other.warnings)
+        self.messages.update(other.messages)
+        for name, rows in other.samples.items():
+            kept = self.samples.setdefault(name, [])
+            kept.extend(row + row_offset for row in rows[:max_samples - len(kept)])
+
+
+def untag(value: Any) -> Any:
+    """Strip one ``<tag>…</tag>`` wrapper as written by the record builders; other values pass through."""
+    if not isinstance(value, str) or not value.startswith("<"):
+        return value
+    end = value.find(">")
+    if end > 1 and value.endswith(f"</{value[1:end]}>"):
+        return value[end + 1:-(end + 2)]
+    return value
+
+
+def _parse_options(value: Any) -> list[str] | None:
+    if isinstance(value, list):
+        return value
+    try:
+        parsed = ast.literal_eval(value.strip())
+    except (AttributeError, ValueError, SyntaxError):
+        return None
+    return parsed if isinstance(parsed, list) else None
+
+
+def _parse_index(value: Any) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _not_in(column: str, allowed: Iterable[str]) -> Callable[[Columns], list[int]]:
+    allowed = frozenset(allowed)
+    return lambda cols: [i for i, value in enumerate(cols[column]) if value not in allowed]
+
+
+def _blank(column: str) -> Callable[[Columns], list[int]]:
+    return lambda cols: [i for i, value in enumerate(cols[column]) if not (isinstance(value, str) and value.strip())]
+
+
+def _na_required(cols: Columns, intents: frozenset[str] = frozenset(INTENT_NA_AMBIGUITY_INTENTS)) -> list[int]:
+    return [i for i, (intent, level) in enumerate(zip(cols["Intent"], cols["Ambiguity"]))
+            if intent in intents and level != "NA"]
+
+
+def _index_outside_options(cols: Columns) -> list[int]:
+    bad = []
+    for i, (options, index) in enumerate(zip(cols["Options"], cols["OutputClassIndex"])):
+        options, index = _parse_options(options), _parse_index(index)
+        if options is None or index is None or not (index == -1 or 1 <= index <= len(options)):
+            bad.append(i)
+    return bad
+
+
+def _unrelated_with_index(cols: Columns) -> list[int]:
+    return [i for i, (output, index) in enumerate(zip(cols["OutputClass"], cols["OutputClassIndex"]))
+            if output == "unrelated" and _parse_index(index) != -1]
+
+
+@lru_cache(maxsize=None)
+def compile_rules(task: str) -> tuple[Rule, ...]:
+    """Build the rule set for *task* once; vocabularies are frozen into the closures."""
+    if task == INTENT_TASK:
+        return (
+            Rule("product_missing", "ProductAttributes is empty", _blank("ProductAttributes"), WARNING),
+            Rule("history_missing", "ChatHistory is empty", _blank("ChatHistory"), WARNING),
+            Rule("utterance_missing", "CustomerUtterance is empty", _blank("CustomerUtterance"), WARNING),
+            Rule("unknown_intent", "Intent is not one of INTENT_OPTIONS", _not_in("Intent", INTENT_OPTIONS)),
+            Rule("unknown_ambiguity", "Ambiguity is not one of INTENT_AMBIGUITY_LEVELS",
+                 _not_in("Ambiguity", INTENT_AMBIGUITY_LEVELS)),
+            Rule("ambiguity_must_be_na", "This intent requires Ambiguity == \"NA\"", _na_required),
+        )
+    if task == TEXT2OPTIONS_TASK:
+        return (
+            Rule("product_missing", "ProductType is empty", _blank("ProductType"), WARNING),
+            Rule("question_missing", "Question is empty", _blank("Question"), WARNING),
+            Rule("unknown_output_class", "OutputClass is not one of TEXT_TO_OPTION_OUTPUT_CLASS",
+                 _not_in("OutputClass", TEXT_TO_OPTION_OUTPUT_CLASS)),
+            Rule("index_outside_options", "OutputClassIndex should be -1 or a 1-based index into Options",
+                 _index_outside_options, WARNING),
+            Rule("unrelated_with_index", "An unrelated reply should have OutputClassIndex -1", _unrelated_with_index,
+                 WARNING),
+        )
+    raise ValueError(f"No validation rules for task {task!r}")
+
+
+# Fields that identify a record's task; a record must carry all of them to be detected as that task.
+TASK_SIGNATURES = {
+    INTENT_TASK: ("Intent", "Ambiguity"),
+    TEXT2OPTIONS_TASK: ("Options", "OutputClass"),
+}
+
+
+def detect_task(record: Mapping[str, Any]) -> str:
+    """Return the task whose signature fields *record* carries; raises :class:`ValueError` for other shapes."""
+    for task, keys in TASK_SIGNATURES.items():
+        if all(key in record for key in keys):
+            return task
+    raise ValueError(f"Unrecognised record shape (keys: {', '.join(sorted(record)) or 'none'})")
+
+
+def to_columns(records: Sequence[Mapping[str, Any]], task: str) -> dict[str, list[Any]]:
+    """Pivot *records* into untagged columns for the fields *task*'s rules read."""
+    keys = ("ProductAttributes", "ChatHistory", "CustomerUtterance", "Intent", "Ambiguity") if task == INTENT_TASK \
+        else ("ProductType", "Question", "Options", "OutputClass", "OutputClassIndex")
+    return {key: [untag(record.get(key)) for record in records] for key in keys}
+
+
+def validate_columns(task: str, columns: Columns, max_samples: int = 5) -> ValidationReport:
+    """Run every rule of *task* over *columns* (each a full column of the batch)."""
+    report = ValidationReport(rows=len(next(iter(columns.values()), ())))
+    for rule in compile_rules(task):
+        bad = list(rule.check(columns))
+        if bad:
+            (report.violations if rule.severity == ERROR else report.warnings)[rule.name] += len(bad)
+            report.samples[rule.name] = bad[:max_samples]
+            report.messages[rule.name] = rule.message
+    return report
+
+
+def review_record(record: Mapping[str, Any], task: str | None = None) -> tuple[list[str], list[str]]:
+    """Return the messages of the error rules and of the warning rules *record* violates."""
+    task = task or detect_task(record)
+    report = validate_columns(task, to_columns([record], task))
+    return [report.messages[name] for name in report.violations], [report.messages[name] for name in report.warnings]
+
+
+def validate_record(record: Mapping[str, Any], task: str | None = None) -> list[str]:
+    """Return the human-readable messages of every error rule *record* violates."""
+    return review_record(record, task)[0]
+
+
+def _parsed(lines: Iterable[str | bytes]) -> Iterator[dict[str, Any]]:
+    for line in lines:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                yield {}
+
+
+def validate_lines(lines: Iterable[str | bytes], task: str | None = None, *,
+                   chunk_rows: int = 50_000) -> ValidationReport:
+    """Validate JSONL *lines* in column batches of *chunk_rows*, never holding more than one batch.
+
+    Without *task* each batch's rule set is detected from its records; :class:`ValueError` is raised
+    when they are not records of a known task.
+    """
+    report = ValidationReport()
+    records = _parsed(lines)
+    while batch := list(islice(records, chunk_rows)):
+        # Unparsable lines come back as ``{}``, so detect on the first real record of the batch.
+        batch_task = task or detect_task(next((record for record in batch if record), {}))
+        report.merge(validate_columns(batch_task, to_columns(batch, batch_task)), row_offset=report.rows)
+    return report
+
+
+def validate_file(path: Path, task: str | None = None, *, chunk_rows: int = 50_000) -> ValidationReport:
+    with path.open("rb") as fp:
+        return validate_lines(fp, task, chunk_rows=chunk_rows)
@@ -0,0 +1,233 @@
+"""Leased work queue that hands unlabelled rows to annotators.
+
+Usage::
+
+    python -m text.work_queue ingest data/intentData_100.jsonl
+    python -m text.work_queue ingest --skip-flagged data/intentData_100.jsonl
+    python -m text.work_queue stats
+
+Only rows that carry an empty ``Labelled?`` column and have the intent task's shape are queued.
+Rows that break a validation rule (e.g. an empty ``ChatHistory``) are queued with the rule
+messages as notes, which the annotator sees on claiming them, or left out with ``--skip-flagged``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from .jsonl_index import JsonlReader
+from .records import INTENT_TASK
+from .sink import DATASET_DIR
+from .validation import detect_task, review_record
+
+OPEN, LEASED, DONE, SKIPPED = "open", "leased", "done", "skipped"
+LEASE_SECONDS = 15 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id            INTEGER PRIMARY KEY,
+    source        TEXT NOT NULL,
+    line          INTEGER NOT NULL,
+    body          TEXT NOT NULL,
+    status        TEXT NOT NULL DEFAULT 'open',
+    owner         TEXT,
+    lease_expires REAL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    notes         TEXT NOT NULL DEFAULT '',
+    UNIQUE (source, line)
+);
+-- Next open item is the first entry of (status, id); expired leases are a range scan of (status, lease_expires).
+CREATE INDEX IF NOT EXISTS items_status_id ON items (status, id);
+CREATE INDEX IF NOT EXISTS items_status_expiry ON items (status, lease_expires);
+CREATE INDEX IF NOT EXISTS items_owner ON items (owner) WHERE status = 'leased';
+-- Items per status, kept up to date by every transition so stats() never scans the items table.
+CREATE TABLE IF NOT EXISTS counts (
+    status TEXT PRIMARY KEY,
+    n      INTEGER NOT NULL
+);
+"""
+
+
+class WorkItem(NamedTuple):
+    id: int
+    source: str
+    line: int
+    record: dict[str, Any]
+    lease_expires: float
+    notes: str = ""
+
+
+def _is_task(row: dict[str, Any], task: str) -> bool:
+    try:
+        return detect_task(row) == task
+    except ValueError:
+        return False
+
+
+class WorkQueue:
+    """SQLite-backed queue of unlabelled rows with time-limited leases.
+
+    :meth:`claim` runs in one ``BEGIN IMMEDIATE`` transaction: it reopens expired leases, then
+    leases the lowest open id through ``UPDATE … RETURNING``. Both statements are index lookups,
+    and the write lock rules out double assignment between sessions and processes. Every status
+    change also adjusts a per-status counts table in the same transaction, so :meth:`stats` never scans.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        if "notes" not in {column for _, column, *_ in self._db.execute("PRAGMA table_info(items)")}:
+            self._db.execute("ALTER TABLE items ADD COLUMN notes TEXT NOT NULL DEFAULT ''")
+        with self._write() as db:
+            # Queues created before the counts table existed get it seeded by one scan.
+            if db.execute("SELECT 1 FROM counts LIMIT 1").fetchone() is None:
+                db.execute("INSERT INTO counts SELECT status, COUNT(*) FROM items GROUP BY status")
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _move(db: sqlite3.Connection, source: str | None, target: str, n: int = 1) -> None:
+        """Shift *n* items from status *source* (``None`` for new items) to *target* in the counts table."""
+        if n:
+            moves = [(target, n)] + ([(source, -n)] if source else [])
+            db.executemany("INSERT INTO counts VALUES (?, ?) ON CONFLICT (status) DO UPDATE SET n = n + excluded.n",
+                           moves)
+
+    def ingest(self, path: Path, label_key: str = "Labelled?", *, task: str = INTENT_TASK,
+               skip_flagged: bool = False) -> int:
+        """Queue *path*'s *task* rows whose *label_key* is present and null; returns the count added.
+
+        Rows without *label_key*, rows of other tasks and already queued rows are skipped. Rows breaking
+        a validation rule are queued with the messages as notes, or not at all with *skip_flagged*.
+        """
+        reader = JsonlReader(path)
+
+        def rows() -> Iterator[tuple[str, int, str, str]]:
+            for idx, obj in enumerate(reader):
+                if obj is None or label_key not in obj or obj[label_key] is not None or not _is_task(obj, task):
+                    continue
+                errors, warnings = review_record(obj, task)
+                problems = errors + warnings
+                if not (problems and skip_flagged):
+                    yield str(path), idx, reader.line(idx).decode().strip(), "; ".join(problems)
+
+        with self._write() as db:
+            before = db.total_changes
+            db.executemany("INSERT OR IGNORE INTO items (source, line, body, notes) VALUES (?, ?, ?, ?)", rows())
+            added = db.total_changes - before
+            self._move(db, None, OPEN, added)
+        return added
+
+    def claim(self, owner: str, lease_seconds: float = LEASE_SECONDS) -> WorkItem | None:
+        """Lease the next open item to *owner* (or return the one it already holds); ``None`` when empty."""
+        now = time.time()
+        with self._write() as db:
+            reopened = db.execute("UPDATE items SET status = 'open', owner = NULL, lease_expires = NULL "
+                                  "WHERE status = 'leased' AND lease_expires < ?", (now,)).rowcount
+            self._move(db, LEASED, OPEN, reopened)
+            row = db.execute(
+                "UPDATE items SET lease_expires = ? WHERE status = 'leased' AND owner = ? "
+                "RETURNING id, source, line, body, lease_expires, notes", (now + lease_seconds, owner)).fetchone()
+            if row is None:
+                row = db.execute(
+                    "UPDATE items SET status = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1 "
+                    "WHERE id = (SELECT id FROM items WHERE status = 'open' ORDER BY id LIMIT 1) "
+                    "RETURNING id, source, line, body, lease_expires, notes",
+                    (owner, now + lease_seconds)).fetchone()
+                if row is not None:
+                    self._move(db, OPEN, LEASED)
+        if row is None:
+            return None
+        item_id, source, line, body, expires, notes = row
+        return WorkItem(item_id, source, line, json.loads(body), expires, notes)
+
+    def renew(self, item_id: int, owner: str, lease_seconds: float = LEASE_SECONDS) -> bool:
+        """Extend *owner*'s lease on *item_id*; ``False`` if the lease was lost (expired and reclaimed)."""
+        with self._write() as db:
+            return bool(db.execute(
+                "UPDATE items SET lease_expires = ? WHERE id = ? AND owner = ? AND status = 'leased' RETURNING id",
+                (time.time() + lease_seconds, item_id, owner)).fetchall())
+
+    def complete(self, item_id: int, owner: str, status: str = DONE) -> bool:
+        """Mark *item_id* labelled (or, with ``status=SKIPPED``, unusable); only the current lease holder can do so."""
+        if status not in (DONE, SKIPPED):
+            raise ValueError(f"An item can only be completed as {DONE!r} or {SKIPPED!r}, not {status!r}")
+        return self._end_lease(item_id, owner, status)
+
+    def release(self, item_id: int, owner: str) -> bool:
+        """Give *item_id* back to the queue without labelling it."""
+        return self._end_lease(item_id, owner, OPEN)
+
+    def _end_lease(self, item_id: int, owner: str, status: str) -> bool:
+        with self._write() as db:
+            clear_owner = ", owner = NULL" if status == OPEN else ""
+            ended = db.execute(
+                f"UPDATE items SET status = ?, lease_expires = NULL{clear_owner} "
+                "WHERE id = ? AND owner = ? AND status = 'leased' RETURNING id", (status, item_id, owner)).fetchall()
+            if ended:
+                self._move(db, LEASED, status)
+        return bool(ended)
+
+    def stats(self) -> dict[str, int]:
+        """Items per status, read from the counts table; leases past their expiry count as open."""
+        # One statement, so the counts and the expired leases come from the same snapshot.
+        with self._lock:
+            counts = dict(self._db.execute(
+                "SELECT status, n FROM counts UNION ALL "
+                "SELECT 'expired', COUNT(*) FROM items WHERE status = 'leased' AND lease_expires < ?",
+                (time.time(),)).fetchall())
+        stats = {status: counts.get(status, 0) for status in (OPEN, LEASED, DONE, SKIPPED)}
+        stats[OPEN] += counts["expired"]
+        stats[LEASED] -= counts["expired"]
+        return stats
+
+
+@lru_cache(maxsize=None)
+def get_work_queue() -> WorkQueue:
+    """Process-wide queue stored alongside the generated datasets."""
+    return WorkQueue(DATASET_DIR / "work_queue.sqlite3")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="queue the unlabelled rows of JSONL files")
+    ingest.add_argument("paths", nargs="+", type=Path)
+    ingest.add_argument("--skip-flagged", action="store_true", help="leave out rows that break a validation rule")
+    commands.add_parser("stats", help="items per status")
+    args = parser.parse_args(argv)
+
+    queue = get_work_queue()
+    if args.command == "ingest":
+        for path in args.paths:
+            print(f"{path}: {queue.ingest(path, skip_flagged=args.skip_flagged)} items queued", file=sys.stderr)
+    for status, count in queue.stats().items():
+        print(f"{status}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())